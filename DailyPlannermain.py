@@ -3,142 +3,25 @@
 # Professional-grade productivity app with advanced features and database
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import json
+from datetime import date, datetime, timedelta
 import time
 import io
-import sqlite3
+import hashlib
+import json
+import uuid
+from contextlib import nullcontext
 
-# Database Class
-class PlannerDatabase:
-    def __init__(self, db_path="planner.db"):
-        self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create schedules table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS schedules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT DEFAULT 'default_user',
-                schedule_name TEXT NOT NULL,
-                tasks_data TEXT NOT NULL,
-                schedule_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create user preferences table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT DEFAULT 'default_user',
-                start_hour INTEGER DEFAULT 7,
-                end_hour INTEGER DEFAULT 22,
-                breakfast_time TEXT DEFAULT '08:00',
-                lunch_time TEXT DEFAULT '12:30',
-                dinner_time TEXT DEFAULT '18:30',
-                default_break INTEGER DEFAULT 10,
-                pomodoro_work INTEGER DEFAULT 25,
-                pomodoro_short_break INTEGER DEFAULT 5,
-                pomodoro_long_break INTEGER DEFAULT 20,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create analytics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT DEFAULT 'default_user',
-                date DATE NOT NULL,
-                total_tasks INTEGER DEFAULT 0,
-                completed_tasks INTEGER DEFAULT 0,
-                total_work_time INTEGER DEFAULT 0,
-                pomodoro_sessions INTEGER DEFAULT 0,
-                productivity_score REAL DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def save_schedule(self, schedule_name, tasks, schedule):
-        """Save a complete schedule to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Convert data to JSON strings
-        tasks_json = json.dumps(tasks)
-        schedule_json = json.dumps(schedule, default=str)  # Handle datetime objects
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO schedules 
-            (user_id, schedule_name, tasks_data, schedule_data, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', ('default_user', schedule_name, tasks_json, schedule_json, datetime.now()))
-        
-        conn.commit()
-        conn.close()
-        return cursor.lastrowid
-    
-    def load_schedule(self, schedule_name):
-        """Load a schedule from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT tasks_data, schedule_data FROM schedules 
-            WHERE user_id = ? AND schedule_name = ?
-            ORDER BY updated_at DESC LIMIT 1
-        ''', ('default_user', schedule_name))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            tasks = json.loads(result[0])
-            schedule = json.loads(result[1])
-            return tasks, schedule
-        return None, None
-    
-    def get_all_schedules(self):
-        """Get list of all saved schedules"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT schedule_name, created_at, updated_at 
-            FROM schedules 
-            WHERE user_id = ?
-            ORDER BY updated_at DESC
-        ''', ('default_user',))
-        
-        schedules = cursor.fetchall()
-        conn.close()
-        return schedules
-    
-    def delete_schedule(self, schedule_name):
-        """Delete a schedule"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            DELETE FROM schedules 
-            WHERE user_id = ? AND schedule_name = ?
-        ''', ('default_user', schedule_name))
-        
-        conn.commit()
-        conn.close()
+from planner import (
+    AnalyticsWriter, Calendar, NON_TASK_TYPES, PlannerDatabase, analytics_aggregates, analytics_rows,
+    analyze_task_comprehensive, figure_cache,
+    IncrementalScheduler, MAX_HORIZON_DAYS, calculate_productivity_score, compact_schedule,
+    ScheduleHistory, create_packed_schedule, export_rows, generate_smart_suggestions, generation_metrics,
+    TIMELINE_PAGE_SIZE, item_id, page_count, plan_horizon, profile, schedule_fingerprint, schedule_totals,
+    time_to_minutes, timeline_cache
+)
+
+# pandas and plotly are imported where tables and charts are built, so the
+# first render of a fresh session does not pay for loading them
 
 # Initialize database
 @st.cache_resource
@@ -148,6 +31,12 @@ def init_database():
 # Get database instance
 db = init_database()
 
+@st.cache_resource
+def init_analytics_writer():
+    return AnalyticsWriter(db)
+
+analytics_writer = init_analytics_writer()
+
 # Page setup
 st.set_page_config(
     page_title="Ultimate AI Daily Planner by Lingli Yang", 
@@ -220,6 +109,14 @@ st.markdown("""
     margin: 5px 0;
 }
 
+.appointment-time {
+    background-color: #eceff1;
+    padding: 10px;
+    border-radius: 5px;
+    border-left: 4px solid #455a64;
+    margin: 5px 0;
+}
+
 .progress-container {
     background: white;
     padding: 20px;
@@ -259,9 +156,11 @@ if 'tasks' not in st.session_state:
 if 'schedule' not in st.session_state:
     st.session_state.schedule = []
 if 'schedule_history' not in st.session_state:
-    st.session_state.schedule_history = []
+    # Bounded; older generations are spilled to the database
+    st.session_state.schedule_history = ScheduleHistory(db=db, session_id=uuid.uuid4().hex)
 if 'completed_tasks' not in st.session_state:
-    st.session_state.completed_tasks = []
+    # Item IDs completed today; a refreshed session picks them up from the database
+    st.session_state.completed_tasks = db.load_completions()
 if 'meal_times' not in st.session_state:
     st.session_state.meal_times = {
         'breakfast': '08:00',
@@ -282,445 +181,208 @@ if 'user_preferences' not in st.session_state:
     }
 if 'task_suggestions' not in st.session_state:
     st.session_state.task_suggestions = []
+if 'schedule_listing' not in st.session_state:
+    st.session_state.schedule_listing = {}
+if 'schedule_page_cursors' not in st.session_state:
+    st.session_state.schedule_page_cursors = [None]
+if 'scheduler' not in st.session_state:
+    st.session_state.scheduler = None
+if 'horizon_plan' not in st.session_state:
+    st.session_state.horizon_plan = None
+if 'appointments' not in st.session_state:
+    st.session_state.appointments = []
+
+# Hidden profiling panel, opened with ?debug=1 in the URL
+debug_mode = st.query_params.get("debug") == "1"
 
 # Helper functions
-def time_to_minutes(time_str):
-    """Convert HH:MM to minutes from midnight"""
-    hours, minutes = map(int, time_str.split(':'))
-    return hours * 60 + minutes
-
-def minutes_to_time(minutes):
-    """Convert minutes from midnight to HH:MM"""
-    hours = minutes // 60
-    mins = minutes % 60
-    return f"{hours:02d}:{mins:02d}"
-
-def analyze_task_comprehensive(task_name):
-    """AI analyzes task and predicts ALL properties automatically"""
-    task_lower = task_name.lower()
-    
-    # Comprehensive task analysis database
-    task_patterns = {
-        # Work tasks
-        'meeting': {'type': 'work', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'team meeting': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'standup': {'type': 'work', 'duration': 15, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'presentation': {'type': 'work', 'duration': 90, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
-        'prepare presentation': {'type': 'work', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
-        'write report': {'type': 'work', 'duration': 120, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
-        'email': {'type': 'work', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'check email': {'type': 'work', 'duration': 20, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'call': {'type': 'work', 'duration': 30, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'phone call': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'client call': {'type': 'work', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': False, 'brain_rest': False},
-        'interview': {'type': 'work', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': False, 'brain_rest': True},
-        'review': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'planning': {'type': 'work', 'duration': 90, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
-        'project work': {'type': 'work', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
-        
-        # Study tasks
-        'study': {'type': 'study', 'duration': 90, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
-        'homework': {'type': 'study', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': True, 'brain_rest': False},
-        'read': {'type': 'study', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'reading': {'type': 'study', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'research': {'type': 'study', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
-        'learn': {'type': 'study', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': False},
-        'exam prep': {'type': 'study', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
-        'practice': {'type': 'study', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': True, 'brain_rest': False},
-        
-        # Health/Exercise
-        'gym': {'type': 'health', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'workout': {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'exercise': {'type': 'health', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'run': {'type': 'health', 'duration': 30, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'running': {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'yoga': {'type': 'health', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'walk': {'type': 'health', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'meditation': {'type': 'health', 'duration': 20, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'doctor appointment': {'type': 'health', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        
-        # Personal tasks
-        'shopping': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'grocery shopping': {'type': 'personal', 'duration': 45, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'clean': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'cleaning': {'type': 'personal', 'duration': 90, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'laundry': {'type': 'personal', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'cook': {'type': 'personal', 'duration': 45, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'cooking': {'type': 'personal', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'meal prep': {'type': 'personal', 'duration': 90, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
-        'organize': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'pay bills': {'type': 'personal', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        
-        # Social activities
-        'coffee': {'type': 'social', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'lunch': {'type': 'social', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'dinner': {'type': 'social', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'hangout': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'visit friends': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'date': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'party': {'type': 'social', 'duration': 180, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        
-        # Entertainment
-        'movie': {'type': 'entertainment', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'tv': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'netflix': {'type': 'entertainment', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'game': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'gaming': {'type': 'entertainment', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'music': {'type': 'entertainment', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
-        'relax': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}
-    }
-    
-    # Find best match with scoring
-    best_match = None
-    highest_score = 0
+def create_analytics_dashboard():
+    """Create comprehensive analytics"""
+    if not st.session_state.schedule:
+        return None
     
-    for pattern, properties in task_patterns.items():
-        pattern_words = pattern.split()
-        task_words = task_lower.split()
-        
-        score = 0
-        for pattern_word in pattern_words:
-            if pattern_word in task_lower:
-                score += len(pattern_word)
-        
-        if score > highest_score:
-            highest_score = score
-            best_match = properties
+    import pandas as pd
     
-    # Keyword-based fallback
-    if best_match is None:
-        if any(word in task_lower for word in ['meeting', 'work', 'presentation', 'email', 'call']):
-            best_match = {'type': 'work', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}
-        elif any(word in task_lower for word in ['study', 'learn', 'read', 'research']):
-            best_match = {'type': 'study', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True}
-        elif any(word in task_lower for word in ['gym', 'exercise', 'workout', 'run']):
-            best_match = {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}
-        elif any(word in task_lower for word in ['clean', 'cook', 'shopping']):
-            best_match = {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}
-        elif any(word in task_lower for word in ['coffee', 'lunch', 'dinner', 'friends']):
-            best_match = {'type': 'social', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}
-        else:
-            best_match = {'type': 'personal', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}
+    df = pd.DataFrame(analytics_rows(st.session_state.schedule))
+    return df
+
+def export_schedule_data():
+    """Export schedule in multiple formats"""
+    if not st.session_state.schedule:
+        return None
     
-    # Map properties
-    difficulty_map = {'Light': 1, 'Moderate': 2, 'High Focus': 3, 'Deep Work': 3}
-    energy_map = {'Light': 'low', 'Moderate': 'medium', 'High Focus': 'high', 'Deep Work': 'high'}
-    mental_map = {'Light': 'low', 'Moderate': 'medium', 'High Focus': 'high', 'Deep Work': 'very_high'}
+    import pandas as pd
     
-    return {
-        'type': best_match['type'],
-        'duration': best_match['duration'],
-        'intensity': best_match['intensity'],
-        'difficulty': difficulty_map[best_match['intensity']],
-        'energy_level': energy_map[best_match['intensity']],
-        'mental_load': mental_map[best_match['intensity']],
-        'use_pomodoro': best_match['pomodoro'],
-        'needs_brain_rest': best_match['brain_rest'],
-        'needs_break_after': best_match['intensity'] in ['Moderate', 'High Focus', 'Deep Work'],
-        'break_duration': 15 if best_match['intensity'] in ['High Focus', 'Deep Work'] else 10
-    }
+    return pd.DataFrame(export_rows(st.session_state.schedule))
 
-def calculate_priority(task_type, difficulty, deadline_days, energy_level, mental_load):
-    """Calculate task priority with user preferences"""
-    type_scores = {'work': 5, 'study': 4, 'health': 4, 'personal': 3, 'social': 2}
-    energy_scores = {'high': 3, 'medium': 2, 'low': 1}
-    mental_scores = {'very_high': 4, 'high': 3, 'medium': 2, 'low': 1}
-    
-    type_score = type_scores.get(task_type, 2)
-    energy_score = energy_scores.get(energy_level, 2)
-    mental_score = mental_scores.get(mental_load, 2)
+def record_daily_analytics():
+    """Queue today's totals for the analytics table without waiting on the write"""
+    totals = schedule_totals(st.session_state.schedule)
+    analytics_writer.record(
+        date.today(),
+        totals['total_tasks'],
+        len(st.session_state.completed_tasks),
+        totals['total_work_time'],
+        totals['pomodoro_sessions'],
+        totals['productivity_score']
+    )
+
+# Advanced settings passed to the scheduling engines, kept in session state by widget key
+SCHEDULE_SETTING_KEYS = ['long_break_after', 'long_break_duration', 'pomodoro_work_time', 'pomodoro_short_break',
+                         'pomodoro_long_break', 'brain_rest_duration', 'brain_activities']
+
+def schedule_settings():
+    return {key: st.session_state[key] for key in SCHEDULE_SETTING_KEYS}
+
+def edit_tasks(operation, index, task=None):
+    """Insert, update or delete one task; a generated schedule is patched from the first affected slot
+    if it was generated from the current tasks, hours, meals and settings"""
+    tasks = st.session_state.tasks
+    scheduler = st.session_state.scheduler
+    in_sync = scheduler is not None and scheduler.matches(
+        tasks, st.session_state.start_hour, st.session_state.end_hour, st.session_state.meal_times,
+        schedule_settings())
     
-    if deadline_days is None:
-        deadline_score = 2
-    elif deadline_days <= 1:
-        deadline_score = 5
-    elif deadline_days <= 3:
-        deadline_score = 3
+    removed = None
+    if operation == 'insert':
+        tasks.insert(index, task)
+        args = (index, task)
+    elif operation == 'update':
+        tasks[index] = task
+        args = (index, task)
     else:
-        deadline_score = 1
-    
-    return type_score + difficulty + deadline_score + energy_score + mental_score
-
-def generate_smart_suggestions(current_tasks):
-    """AI-powered task suggestions based on user history"""
-    common_tasks = [
-        "Check emails", "Team standup", "Review calendar", "Coffee break",
-        "Lunch meeting", "Project planning", "Study session", "Gym workout",
-        "Grocery shopping", "Meal prep", "Read industry news", "Call family"
-    ]
-    
-    # Filter out tasks user already has
-    existing_names = [task['name'].lower() for task in current_tasks]
-    suggestions = [task for task in common_tasks if task.lower() not in existing_names]
+        removed = tasks.pop(index)
+        args = (index,)
     
-    return suggestions[:5]  # Return top 5 suggestions
+    if in_sync:
+        st.session_state.schedule = compact_schedule(getattr(scheduler, operation)(*args))
+    else:
+        st.session_state.scheduler = None
+    return removed
 
-def create_pomodoro_sessions(task_duration, work_time, short_break, long_break):
-    """Create Pomodoro breakdown"""
-    sessions = []
-    remaining = task_duration
-    session_count = 0
-    
-    while remaining > 0:
-        session_count += 1
-        work_duration = min(work_time, remaining)
-        
-        sessions.append({
-            'type': 'pomodoro_work',
-            'duration': work_duration,
-            'session': session_count
-        })
-        remaining -= work_duration
-        
-        if remaining > 0:
-            if session_count % 4 == 0:
-                sessions.append({
-                    'type': 'pomodoro_long_break',
-                    'duration': long_break,
-                    'session': session_count
-                })
-            else:
-                sessions.append({
-                    'type': 'pomodoro_short_break',
-                    'duration': short_break,
-                    'session': session_count
-                })
-    
-    return sessions
+# Saved schedules shown per sidebar page
+SCHEDULE_PAGE_SIZE = 20
 
-def create_schedule(tasks, start_hour, end_hour, meal_times, settings):
-    """Enhanced scheduling with analytics tracking"""
-    if not tasks:
-        return []
-    
-    schedule = []
-    analyzed_tasks = []
+def get_schedule_page(prefix, after):
+    """One page of saved schedules (plus one extra row to detect a next page), cached in the session"""
+    key = (prefix, after)
+    if key not in st.session_state.schedule_listing:
+        st.session_state.schedule_listing[key] = db.list_schedules(SCHEDULE_PAGE_SIZE + 1, after, prefix)
+    return st.session_state.schedule_listing[key]
+
+def invalidate_schedule_listing():
+    """Forget cached pages after a save or delete"""
+    st.session_state.schedule_listing = {}
+    st.session_state.schedule_page_cursors = [None]
+
+def current_schedule_fingerprint():
+    """Content hash of the session schedule, recomputed only when the schedule is replaced"""
+    schedule = st.session_state.schedule
+    cached = st.session_state.get('timeline_fingerprint')
+    if cached is None or cached[0] is not schedule:
+        cached = (schedule, schedule_fingerprint(schedule))
+        st.session_state.timeline_fingerprint = cached
+    return cached[1]
+
+def tasks_fingerprint():
+    """Content hash of the task list; hashing one string is far cheaper for st.cache_data than the list"""
+    key = repr([(task['name'], task['deadline_days']) for task in st.session_state.tasks])
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+# The cached views below are keyed on task or schedule content, so reruns
+# triggered by unrelated widgets reuse them instead of recomputing
+@st.cache_data(max_entries=64)
+def task_overview(fingerprint, _tasks):
+    """Activity table, total AI estimate and focus minutes for the task list with this fingerprint"""
+    import pandas as pd
     
-    # Analyze all tasks
-    for task in tasks:
-        analysis = analyze_task_comprehensive(task['name'])
-        priority = calculate_priority(
-            analysis['type'], 
-            analysis['difficulty'], 
-            task['deadline_days'], 
-            analysis['energy_level'], 
-            analysis['mental_load']
-        )
+    task_data = []
+    total_ai_time = 0
+    focus_time = 0
+    for i, task in enumerate(_tasks, 1):
+        name, deadline_days = task['name'], task['deadline_days']
+        analysis = analyze_task_comprehensive(name)
+        deadline_text = f"{deadline_days} days" if deadline_days is not None else "Flexible"
+        total_ai_time += analysis['duration']
+        if analysis['intensity'] in ['High Focus', 'Deep Work']:
+            focus_time += analysis['duration']
         
-        analyzed_tasks.append({
-            'name': task['name'],
-            'type': analysis['type'],
-            'difficulty': analysis['difficulty'],
-            'energy_level': analysis['energy_level'],
-            'mental_load': analysis['mental_load'],
-            'intensity': analysis['intensity'],
-            'priority': priority,
-            'duration': analysis['duration'],
-            'deadline_days': task['deadline_days'],
-            'needs_break_after': analysis['needs_break_after'],
-            'break_duration': analysis['break_duration'],
-            'use_pomodoro': analysis['use_pomodoro'],
-            'needs_brain_rest': analysis['needs_brain_rest']
+        task_data.append({
+            '#': i,
+            'Activity': name,
+            'AI Duration': f"{analysis['duration']} min",
+            'AI Intensity': analysis['intensity'],
+            'AI Type': analysis['type'].title(),
+            'Deadline': deadline_text,
+            'Pomodoro': "Yes" if analysis['use_pomodoro'] else "No",
+            'Brain Rest': "Yes" if analysis['needs_brain_rest'] else "No"
         })
+    return pd.DataFrame(task_data), total_ai_time, focus_time
+
+@st.cache_data(max_entries=32)
+def schedule_overview(fingerprint, _schedule):
+    """Quick Stats counts for the schedule with this fingerprint"""
+    work_items = [item for item in _schedule if item['type'] not in NON_TASK_TYPES]
+    return {
+        'tasks': len(work_items),
+        'pomodoro_sessions': sum(1 for item in _schedule if 'pomodoro' in item['type']),
+        'brain_rests': sum(1 for item in _schedule if item['type'] == 'brain_rest'),
+        'productivity_score': calculate_productivity_score(work_items) if work_items else None
+    }
+
+@st.cache_data(max_entries=32)
+def schedule_aggregates(fingerprint, _schedule):
+    """Single-pass chart aggregates for the schedule with this fingerprint"""
+    return analytics_aggregates(_schedule)
+
+def cached_figure(key, build):
+    """Plotly figure from the shared figure cache, built and serialized on a miss"""
+    import plotly.graph_objects as go
     
-    # Sort by priority and energy level
-    analyzed_tasks.sort(key=lambda x: (x['priority'], x['energy_level'] == 'high'), reverse=True)
-    
-    # Schedule creation with enhanced logic
-    current_time = start_hour * 60
-    end_time = end_hour * 60
-    
-    breakfast_time = time_to_minutes(meal_times['breakfast'])
-    lunch_time = time_to_minutes(meal_times['lunch'])
-    dinner_time = time_to_minutes(meal_times['dinner'])
-    
-    task_index = 0
-    work_time_since_break = 0
-    
-    while task_index < len(analyzed_tasks) and current_time < end_time:
-        
-        # Meal scheduling
-        if abs(current_time - breakfast_time) <= 15 and not any(item.get('time_minutes') == breakfast_time for item in schedule):
-            schedule.append({
-                'name': '🍳 Breakfast',
-                'type': 'meal',
-                'start_time': minutes_to_time(breakfast_time),
-                'end_time': minutes_to_time(breakfast_time + 30),
-                'duration': 30,
-                'time_minutes': breakfast_time
-            })
-            current_time = max(current_time, breakfast_time + 30)
-            continue
-            
-        if abs(current_time - lunch_time) <= 30 and not any(item.get('time_minutes') == lunch_time for item in schedule):
-            schedule.append({
-                'name': '🥗 Lunch Break',
-                'type': 'meal',
-                'start_time': minutes_to_time(lunch_time),
-                'end_time': minutes_to_time(lunch_time + 45),
-                'duration': 45,
-                'time_minutes': lunch_time
-            })
-            current_time = max(current_time, lunch_time + 45)
-            work_time_since_break = 0
-            continue
-            
-        if abs(current_time - dinner_time) <= 30 and not any(item.get('time_minutes') == dinner_time for item in schedule):
-            schedule.append({
-                'name': '🍽️ Dinner Time',
-                'type': 'meal',
-                'start_time': minutes_to_time(dinner_time),
-                'end_time': minutes_to_time(dinner_time + 60),
-                'duration': 60,
-                'time_minutes': dinner_time
-            })
-            current_time = max(current_time, dinner_time + 60)
-            work_time_since_break = 0
-            continue
-        
-        # Long break check
-        if work_time_since_break >= settings['long_break_after'] * 60:
-            schedule.append({
-                'name': f'☕ Long Break ({settings["long_break_duration"]} min)',
-                'type': 'long_break',
-                'start_time': minutes_to_time(current_time),
-                'end_time': minutes_to_time(current_time + settings['long_break_duration']),
-                'duration': settings['long_break_duration'],
-                'time_minutes': current_time
-            })
-            current_time += settings['long_break_duration']
-            work_time_since_break = 0
-            continue
-        
-        # Task scheduling
-        if task_index < len(analyzed_tasks):
-            task = analyzed_tasks[task_index]
-            
-            if current_time + task['duration'] > end_time:
-                break
-            
-            # Pomodoro handling
-            if task['use_pomodoro'] and task['duration'] > settings['pomodoro_work_time']:
-                pomodoro_sessions = create_pomodoro_sessions(
-                    task['duration'], 
-                    settings['pomodoro_work_time'],
-                    settings['pomodoro_short_break'],
-                    settings['pomodoro_long_break']
-                )
-                
-                for session in pomodoro_sessions:
-                    if session['type'] == 'pomodoro_work':
-                        schedule.append({
-                            'name': f"🍅 {task['name']} (Session #{session['session']})",
-                            'type': 'pomodoro_work',
-                            'original_type': task['type'],
-                            'priority': task['priority'],
-                            'intensity': task['intensity'],
-                            'start_time': minutes_to_time(current_time),
-                            'end_time': minutes_to_time(current_time + session['duration']),
-                            'duration': session['duration'],
-                            'deadline_days': task['deadline_days'],
-                            'time_minutes': current_time
-                        })
-                        current_time += session['duration']
-                        work_time_since_break += session['duration']
-                        
-                    else:
-                        break_name = f"🍅 Pomodoro {'Long ' if 'long' in session['type'] else ''}Break"
-                        schedule.append({
-                            'name': f"{break_name} ({session['duration']} min)",
-                            'type': session['type'],
-                            'start_time': minutes_to_time(current_time),
-                            'end_time': minutes_to_time(current_time + session['duration']),
-                            'duration': session['duration'],
-                            'time_minutes': current_time
-                        })
-                        current_time += session['duration']
-                        if 'long' in session['type']:
-                            work_time_since_break = 0
-            else:
-                # Regular task
-                schedule.append({
-                    'name': task['name'],
-                    'type': task['type'],
-                    'priority': task['priority'],
-                    'intensity': task['intensity'],
-                    'start_time': minutes_to_time(current_time),
-                    'end_time': minutes_to_time(current_time + task['duration']),
-                    'duration': task['duration'],
-                    'deadline_days': task['deadline_days'],
-                    'time_minutes': current_time
-                })
-                current_time += task['duration']
-                work_time_since_break += task['duration']
-                
-                # Regular break
-                if task['needs_break_after'] and task_index < len(analyzed_tasks) - 1:
-                    schedule.append({
-                        'name': f'⏸️ Break ({task["break_duration"]} min)',
-                        'type': 'break',
-                        'start_time': minutes_to_time(current_time),
-                        'end_time': minutes_to_time(current_time + task['break_duration']),
-                        'duration': task['break_duration'],
-                        'time_minutes': current_time
-                    })
-                    current_time += task['break_duration']
-            
-            # Brain rest
-            if task['needs_brain_rest'] and task['mental_load'] in ['high', 'very_high']:
-                brain_activity = settings['brain_activities'][0] if settings['brain_activities'] else "🧠 Brain Rest"
-                schedule.append({
-                    'name': f'🧠 Brain Rest: {brain_activity} ({settings["brain_rest_duration"]} min)',
-                    'type': 'brain_rest',
-                    'start_time': minutes_to_time(current_time),
-                    'end_time': minutes_to_time(current_time + settings['brain_rest_duration']),
-                    'duration': settings['brain_rest_duration'],
-                    'time_minutes': current_time
-                })
-                current_time += settings['brain_rest_duration']
-                work_time_since_break = 0
-            
-            task_index += 1
-    
-    return schedule
+    spec = figure_cache.get(key, lambda: build().to_json())
+    # The JSON came from a validated figure, so skip revalidating it on every rerun
+    return go.Figure(json.loads(spec), _validate=False)
 
-def create_analytics_dashboard():
-    """Create comprehensive analytics"""
-    if not st.session_state.schedule:
-        return None
+# Analytics figures; each is built only when its cache key is new
+def time_distribution_figure(aggregates):
+    import plotly.express as px
     
-    # Collect data
-    schedule_data = []
-    for item in st.session_state.schedule:
-        schedule_data.append({
-            'name': item['name'],
-            'type': item.get('type', 'unknown'),
-            'duration': item['duration'],
-            'intensity': item.get('intensity', 'Light'),
-            'start_hour': int(item['start_time'].split(':')[0]) if 'start_time' in item else 9
-        })
+    minutes_by_type = aggregates['minutes_by_type']
+    fig_pie = px.pie({'type': list(minutes_by_type), 'duration': list(minutes_by_type.values())},
+                     values='duration', names='type', title="Time Allocation by Activity Type")
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    return fig_pie
+
+def activity_timeline_figure(aggregates):
+    import plotly.express as px
     
-    df = pd.DataFrame(schedule_data)
-    return df
+    fig_timeline = px.scatter(aggregates['timeline'], x='start_hour', y='duration', 
+                              color='type', size='duration',
+                              title="Activities Throughout the Day")
+    fig_timeline.update_layout(xaxis_title="Hour of Day", yaxis_title="Duration (minutes)")
+    return fig_timeline
 
-def export_schedule_data():
-    """Export schedule in multiple formats"""
-    if not st.session_state.schedule:
-        return None
+def intensity_figure(aggregates):
+    import plotly.express as px
     
-    # Create export data
-    export_data = []
-    for item in st.session_state.schedule:
-        export_data.append({
-            'Time': f"{item.get('start_time', 'N/A')} - {item.get('end_time', 'N/A')}",
-            'Activity': item['name'],
-            'Type': item.get('type', 'unknown'),
-            'Duration (min)': item['duration'],
-            'Intensity': item.get('intensity', 'N/A'),
-            'Priority': item.get('priority', 'N/A')
-        })
+    intensity_counts = aggregates['intensity_counts']
+    return px.bar(x=list(intensity_counts), y=list(intensity_counts.values()),
+                  title="Task Intensity Distribution",
+                  color=list(intensity_counts.values()),
+                  color_continuous_scale="viridis")
+
+def weekly_trend_figure(days, productivity_scores):
+    import plotly.graph_objects as go
     
-    return pd.DataFrame(export_data)
+    fig_line = go.Figure()
+    fig_line.add_trace(go.Scatter(x=days, y=productivity_scores, 
+                                  mode='lines+markers',
+                                  name='Productivity Score',
+                                  connectgaps=True,
+                                  line=dict(color='#667eea', width=3)))
+    fig_line.update_layout(title="Weekly Productivity Trend", 
+                           xaxis_title="Day", yaxis_title="Productivity Score (%)")
+    return fig_line
 
 # Sidebar Configuration
 st.sidebar.title("⚙️ Ultimate Planner Settings")
@@ -729,84 +391,178 @@ st.sidebar.title("⚙️ Ultimate Planner Settings")
 if st.sidebar.button("🌙 Toggle Dark Mode"):
     st.session_state.dark_mode = not st.session_state.dark_mode
 
-# Time settings
-st.sidebar.subheader("🕐 Working Hours")
-start_hour = st.sidebar.slider("Start Hour", 6, 12, 7)
-end_hour = st.sidebar.slider("End Hour", 18, 24, 22)
-
-if start_hour >= end_hour:
-    st.sidebar.error("Start hour must be less than end hour!")
-    available_hours = 0
-else:
-    available_hours = end_hour - start_hour
-    st.sidebar.success(f"Available: {available_hours} hours")
+# Settings panels are fragments: their widgets are keyed and only read by
+# Generate, so moving a slider reruns the panel instead of the whole app
+@st.fragment
+def working_hours_panel():
+    """Working hours, planning horizon and meal times"""
+    st.subheader("🕐 Working Hours")
+    start_hour = st.slider("Start Hour", 6, 12, 7, key="start_hour")
+    end_hour = st.slider("End Hour", 18, 24, 22, key="end_hour")
+    
+    if start_hour >= end_hour:
+        st.error("Start hour must be less than end hour!")
+    else:
+        st.success(f"Available: {end_hour - start_hour} hours")
+    
+    st.number_input(
+        "Plan ahead (days)", min_value=1, max_value=MAX_HORIZON_DAYS, value=1, key="plan_days",
+        help="Spread activities over several days, up to each one's deadline"
+    )
+    
+    # Meal times
+    st.subheader("🍽️ Meal Times")
+    st.session_state.meal_times['breakfast'] = st.time_input(
+        "Breakfast", datetime.strptime("08:00", "%H:%M").time()
+    ).strftime("%H:%M")
+    
+    st.session_state.meal_times['lunch'] = st.time_input(
+        "Lunch", datetime.strptime("12:30", "%H:%M").time()
+    ).strftime("%H:%M")
+    
+    st.session_state.meal_times['dinner'] = st.time_input(
+        "Dinner", datetime.strptime("18:30", "%H:%M").time()
+    ).strftime("%H:%M")
 
-# Meal times
-st.sidebar.subheader("🍽️ Meal Times")
-st.session_state.meal_times['breakfast'] = st.sidebar.time_input(
-    "Breakfast", datetime.strptime("08:00", "%H:%M").time()
-).strftime("%H:%M")
+with st.sidebar:
+    working_hours_panel()
 
-st.session_state.meal_times['lunch'] = st.sidebar.time_input(
-    "Lunch", datetime.strptime("12:30", "%H:%M").time()
-).strftime("%H:%M")
+# Fixed appointments; activities are scheduled around them
+st.sidebar.subheader("📌 Appointments")
+calendar = Calendar.from_appointments(st.session_state.appointments)
+with st.sidebar.form("appointment_form", clear_on_submit=True):
+    appointment_name = st.text_input("Appointment", placeholder="e.g., Doctor, Client meeting")
+    appointment_start = st.time_input("Starts", datetime.strptime("10:00", "%H:%M").time())
+    appointment_end = st.time_input("Ends", datetime.strptime("11:00", "%H:%M").time())
+    
+    if st.form_submit_button("📌 Add Appointment") and appointment_name:
+        appointment = {
+            'name': f"📌 {appointment_name}",
+            'start': appointment_start.strftime("%H:%M"),
+            'end': appointment_end.strftime("%H:%M")
+        }
+        try:
+            calendar.add(time_to_minutes(appointment['start']), time_to_minutes(appointment['end']), appointment['name'])
+        except ValueError as e:
+            st.sidebar.error(str(e))
+        else:
+            st.session_state.appointments.append(appointment)
+            st.session_state.scheduler = None
+            st.sidebar.success(f"Added {appointment_name}, regenerate to fit activities around it")
 
-st.session_state.meal_times['dinner'] = st.sidebar.time_input(
-    "Dinner", datetime.strptime("18:30", "%H:%M").time()
-).strftime("%H:%M")
+for index, appointment in enumerate(st.session_state.appointments):
+    col1, col2 = st.sidebar.columns([4, 1])
+    col1.write(f"{appointment['start']} - {appointment['end']} {appointment['name']}")
+    if col2.button("✖", key=f"remove_appointment_{index}"):
+        st.session_state.appointments.pop(index)
+        st.session_state.scheduler = None
+        st.rerun()
 
 # Database Save/Load functionality
-st.sidebar.subheader("💾 Save & Load Schedules")
-
-# Save current schedule
-if st.session_state.schedule:
-    schedule_name = st.sidebar.text_input("Schedule name:", f"Schedule_{datetime.now().strftime('%m%d_%H%M')}")
-    if st.sidebar.button("💾 Save Current Schedule"):
-        try:
-            db.save_schedule(schedule_name, st.session_state.tasks, st.session_state.schedule)
-            st.sidebar.success(f"Saved '{schedule_name}'!")
-        except Exception as e:
-            st.sidebar.error(f"Error: {e}")
-
-# Load saved schedules
-try:
-    schedules = db.get_all_schedules()
-    if schedules:
-        schedule_options = [f"{s[0]} ({s[2][:10]})" for s in schedules]
-        selected = st.sidebar.selectbox("Load saved schedule:", [""] + schedule_options)
+@st.fragment
+def saved_schedules_panel():
+    """Save, search, page through and load saved schedules; browsing reruns only this panel"""
+    st.subheader("💾 Save & Load Schedules")
+    
+    # Save current schedule
+    if st.session_state.schedule:
+        schedule_name = st.text_input("Schedule name:", f"Schedule_{datetime.now().strftime('%m%d_%H%M')}")
+        if st.button("💾 Save Current Schedule"):
+            try:
+                db.save_schedule(schedule_name, st.session_state.tasks, st.session_state.schedule)
+                invalidate_schedule_listing()
+                st.success(f"Saved '{schedule_name}'!")
+            except Exception as e:
+                st.error(f"Error: {e}")
+    
+    # Load saved schedules
+    try:
+        if get_schedule_page('', None):
+            search = st.text_input("Search saved schedules:", key="schedule_search")
+            if search != st.session_state.get('schedule_search_prefix', ''):
+                st.session_state.schedule_search_prefix = search
+                st.session_state.schedule_page_cursors = [None]
+        
+            cursors = st.session_state.schedule_page_cursors
+            schedules = get_schedule_page(search, cursors[-1])
+            has_next_page = len(schedules) > SCHEDULE_PAGE_SIZE
+            schedules = schedules[:SCHEDULE_PAGE_SIZE]
+        
+            schedule_labels = {s[0]: f"{s[0]} ({s[2][:10]})" for s in schedules}
+            selected = st.selectbox("Load saved schedule:", [""] + list(schedule_labels),
+                                    format_func=lambda name: schedule_labels.get(name, name))
+        
+            if len(cursors) > 1 or has_next_page:
+                prev_col, next_col = st.columns(2)
+                with prev_col:
+                    if len(cursors) > 1 and st.button("◀ Newer"):
+                        cursors.pop()
+                        st.rerun(scope="fragment")
+                with next_col:
+                    if has_next_page and st.button("Older ▶"):
+                        cursors.append((schedules[-1][2], schedules[-1][0]))
+                        st.rerun(scope="fragment")
         
-        if selected and st.sidebar.button("📂 Load Schedule"):
-            schedule_name = selected.split(" (")[0]
-            tasks, schedule = db.load_schedule(schedule_name)
-            if tasks and schedule:
-                st.session_state.tasks = tasks
-                st.session_state.schedule = schedule
-                st.sidebar.success(f"Loaded '{schedule_name}'!")
-                st.rerun()
-except Exception as e:
-    st.sidebar.info("Database initializing...")
+            if selected:
+                # Header-only read; the stored schedule is decoded on Load
+                summary_key = ('summary', selected)
+                if summary_key not in st.session_state.schedule_listing:
+                    st.session_state.schedule_listing[summary_key] = db.load_schedule_summary(selected)
+                summary = st.session_state.schedule_listing[summary_key]
+                if summary:
+                    st.caption(f"{summary['items']} items, {summary['start_time']} - {summary['end_time']}")
+        
+            if selected and st.button("📂 Load Schedule"):
+                schedule_name = selected
+                tasks, schedule = db.load_schedule(schedule_name)
+                if tasks and schedule:
+                    st.session_state.tasks = tasks
+                    st.session_state.schedule = compact_schedule(schedule)
+                    st.session_state.scheduler = None
+                    st.session_state.horizon_plan = None
+                    record_daily_analytics()
+                    st.success(f"Loaded '{schedule_name}'!")
+                    st.rerun()
+    except Exception as e:
+        st.info("Database initializing...")
+
+with st.sidebar:
+    saved_schedules_panel()
 
 # Advanced settings
-with st.sidebar.expander("🔧 Advanced Settings"):
-    default_break = st.slider("Default break (minutes)", 5, 30, 10)
-    long_break_after = st.slider("Long break after (hours)", 2, 4, 3)
-    long_break_duration = st.slider("Long break duration (minutes)", 15, 60, 30)
+@st.fragment
+def advanced_settings_panel():
+    """Break, engine, Pomodoro and brain rest settings"""
+    st.slider("Default break (minutes)", 5, 30, 10, key="default_break")
+    st.slider("Long break after (hours)", 2, 4, 3, key="long_break_after")
+    st.slider("Long break duration (minutes)", 15, 60, 30, key="long_break_duration")
+    st.radio(
+        "Scheduling engine",
+        ["⚡ Greedy", "🧩 Slot packing"],
+        key="scheduling_engine",
+        help="Slot packing keeps meals at their set times and fits as much priority work as possible around them, "
+             "unless the greedy schedule is worth more"
+    )
     
     # Pomodoro settings
     st.subheader("🍅 Pomodoro Settings")
-    pomodoro_work_time = st.slider("Work session (minutes)", 20, 30, 25)
-    pomodoro_short_break = st.slider("Short break (minutes)", 3, 10, 5)
-    pomodoro_long_break = st.slider("Long break (minutes)", 15, 30, 20)
+    st.slider("Work session (minutes)", 20, 30, 25, key="pomodoro_work_time")
+    st.slider("Short break (minutes)", 3, 10, 5, key="pomodoro_short_break")
+    st.slider("Long break (minutes)", 15, 30, 20, key="pomodoro_long_break")
     
     # Brain rest settings
     st.subheader("🧠 Brain Rest Settings")
-    brain_rest_duration = st.slider("Brain rest duration (minutes)", 30, 120, 60)
-    brain_activities = st.multiselect(
+    st.slider("Brain rest duration (minutes)", 30, 120, 60, key="brain_rest_duration")
+    st.multiselect(
         "Brain rest activities",
         ["🚶 Light walk", "🧘 Meditation", "🎵 Music", "☕ Coffee", "🌿 Fresh air", "💤 Nap"],
-        default=["🚶 Light walk", "☕ Coffee"]
+        default=["🚶 Light walk", "☕ Coffee"],
+        key="brain_activities"
     )
 
+with st.sidebar.expander("🔧 Advanced Settings"):
+    advanced_settings_panel()
+
 # Smart task suggestions
 st.sidebar.subheader("💡 Smart Suggestions")
 suggestions = generate_smart_suggestions(st.session_state.tasks)
@@ -817,7 +573,7 @@ if suggestions:
             'name': selected_suggestion,
             'deadline_days': None
         }
-        st.session_state.tasks.append(new_task)
+        edit_tasks('insert', len(st.session_state.tasks), new_task)
         analysis = analyze_task_comprehensive(selected_suggestion)
         st.sidebar.success(f"Added: {selected_suggestion}")
         st.sidebar.info(f"🤖 AI: {analysis['duration']} min, {analysis['intensity']}")
@@ -839,7 +595,7 @@ with st.sidebar.form("task_form"):
                 'name': task_name,
                 'deadline_days': deadline_days
             }
-            st.session_state.tasks.append(new_task)
+            edit_tasks('insert', len(st.session_state.tasks), new_task)
             
             analysis = analyze_task_comprehensive(task_name)
             st.sidebar.success(f"Added: {task_name}")
@@ -855,43 +611,95 @@ with col1:
     if st.button("🧹 Clear All"):
         st.session_state.tasks = []
         st.session_state.schedule = []
+        st.session_state.scheduler = None
+        st.session_state.horizon_plan = None
         st.session_state.editing_mode = False
         st.session_state.edit_index = None
 
 with col2:
     if st.button("🤖 Generate"):
         if st.session_state.tasks:
-            settings = {
-                'long_break_after': long_break_after,
-                'long_break_duration': long_break_duration,
-                'pomodoro_work_time': pomodoro_work_time,
-                'pomodoro_short_break': pomodoro_short_break,
-                'pomodoro_long_break': pomodoro_long_break,
-                'brain_rest_duration': brain_rest_duration,
-                'brain_activities': brain_activities
-            }
+            # Values of the settings panels, kept in session state by widget key
+            start_hour = st.session_state.start_hour
+            end_hour = st.session_state.end_hour
+            plan_days = st.session_state.plan_days
+            scheduling_engine = st.session_state.scheduling_engine
+            settings = schedule_settings()
             
-            with st.spinner('🤖 AI is optimizing your schedule...'):
-                time.sleep(1)  # Simulate processing
-                st.session_state.schedule = create_schedule(
-                    st.session_state.tasks,
-                    start_hour,
-                    end_hour,
-                    st.session_state.meal_times,
-                    settings
-                )
+            timings = {}
+            with st.spinner('🤖 AI is optimizing your schedule...'), \
+                    (profile() if debug_mode else nullcontext()) as profiler:
+                st.session_state.horizon_plan = None
+                if plan_days > 1:
+                    st.session_state.scheduler = None
+                    st.session_state.horizon_plan = plan_horizon(
+                        st.session_state.tasks,
+                        plan_days,
+                        start_hour,
+                        end_hour,
+                        st.session_state.meal_times,
+                        settings,
+                        timings=timings,
+                        calendar=calendar
+                    )
+                    schedule = st.session_state.horizon_plan['days'][0]['schedule']
+                elif scheduling_engine == "🧩 Slot packing":
+                    # Edits are not patched incrementally in this mode
+                    st.session_state.scheduler = None
+                    schedule = create_packed_schedule(
+                        st.session_state.tasks,
+                        start_hour,
+                        end_hour,
+                        st.session_state.meal_times,
+                        settings,
+                        timings=timings,
+                        calendar=calendar
+                    )
+                else:
+                    st.session_state.scheduler = IncrementalScheduler(
+                        st.session_state.tasks,
+                        start_hour,
+                        end_hour,
+                        st.session_state.meal_times,
+                        settings,
+                        timings=timings,
+                        calendar=calendar
+                    )
+                    schedule = st.session_state.scheduler.schedule
+                st.session_state.schedule = compact_schedule(schedule)
                 
                 # Save to history
-                st.session_state.schedule_history.append({
-                    'timestamp': datetime.now(),
-                    'schedule': st.session_state.schedule.copy(),
-                    'tasks_count': len(st.session_state.tasks)
-                })
-                
-            st.sidebar.success("✨ Schedule optimized!")
+                history_started = time.perf_counter()
+                st.session_state.schedule_history.append(st.session_state.schedule, len(st.session_state.tasks))
+                timings['history'] = time.perf_counter() - history_started
+                record_daily_analytics()
+            
+            st.session_state.last_generation_timings = timings
+            generation_metrics.record(timings)
+            if profiler is not None:
+                profiler.add_phases(timings)
+                profiler.log()
+                st.session_state.last_profile = profiler.report()
+            st.sidebar.success(f"✨ Schedule optimized in {sum(timings.values()) * 1000:.1f} ms!")
         else:
             st.sidebar.error("Add activities first!")
 
+# Real timings of the last generation and averages across all sessions
+if st.session_state.get('last_generation_timings'):
+    with st.sidebar.expander("⏱️ Generation Timings"):
+        for phase, seconds in st.session_state.last_generation_timings.items():
+            st.write(f"**{phase.title()}:** {seconds * 1000:.2f} ms")
+        
+        st.caption("All sessions (average / worst)")
+        for phase, stats in generation_metrics.snapshot().items():
+            st.metric(phase.title(), f"{stats['avg_ms']:.2f} ms", f"max {stats['max_ms']:.2f} ms",
+                      delta_color="off")
+
+if debug_mode and st.session_state.get('last_profile'):
+    with st.sidebar.expander("🐞 Profiling", expanded=True):
+        st.caption("Last generation; helper times include the helpers they call")
+        st.table(st.session_state.last_profile)
+
 # File operations
 st.sidebar.subheader("📊 Export Data")
 col1, col2 = st.sidebar.columns(2)
@@ -923,185 +731,158 @@ with col2:
 # Main content - Tabs for better organization
 tab1, tab2, tab3, tab4 = st.tabs(["📋 Schedule", "📊 Analytics", "✏️ Edit Tasks", "📈 Progress"])
 
-with tab1:
+@st.fragment
+def schedule_tab():
+    """Activities, the timeline and quick stats"""
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.subheader("📋 Your Activities")
         
         if st.session_state.tasks:
-            task_data = []
-            for i, task in enumerate(st.session_state.tasks, 1):
-                analysis = analyze_task_comprehensive(task['name'])
-                deadline_text = f"{task['deadline_days']} days" if task['deadline_days'] is not None else "Flexible"
-                
-                task_data.append({
-                    '#': i,
-                    'Activity': task['name'],
-                    'AI Duration': f"{analysis['duration']} min",
-                    'AI Intensity': analysis['intensity'],
-                    'AI Type': analysis['type'].title(),
-                    'Deadline': deadline_text,
-                    'Pomodoro': "Yes" if analysis['use_pomodoro'] else "No",
-                    'Brain Rest': "Yes" if analysis['needs_brain_rest'] else "No"
-                })
-            
-            df = pd.DataFrame(task_data)
+            df, _, _ = task_overview(tasks_fingerprint(), st.session_state.tasks)
             st.dataframe(df, use_container_width=True)
         else:
             st.info("👈 Just type what you need to do - AI handles the rest!")
-
+        
         # Display schedule
         if st.session_state.schedule:
             st.subheader("🗓️ Your Optimized Schedule")
             
-            for i, item in enumerate(st.session_state.schedule, 1):
-                if item['type'] == 'meal':
-                    st.markdown(f"""
-                    <div class="meal-time">
-                    <strong>{i}. {item['name']}</strong><br>
-                    🕐 {item['start_time']} - {item['end_time']} ({item['duration']} min)
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                elif 'break' in item['type']:
-                    st.markdown(f"""
-                    <div class="break-time">
-                    <strong>{i}. {item['name']}</strong><br>
-                    🕐 {item['start_time']} - {item['end_time']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                elif item['type'] == 'brain_rest':
-                    st.markdown(f"""
-                    <div class="brain-rest-time">
-                    <strong>{i}. {item['name']}</strong><br>
-                    🕐 {item['start_time']} - {item['end_time']}<br>
-                    💡 <em>Mental recovery after intensive work</em>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                elif item['type'] == 'pomodoro_work':
-                    st.markdown(f"""
-                    <div class="pomodoro-time">
-                    <strong>{i}. {item['name']}</strong><br>
-                    🕐 {item['start_time']} - {item['end_time']} ({item['duration']} min)<br>
-                    🍅 Pomodoro Session | 🔥 {item['intensity']} | ⚡ Priority: {item['priority']}/20
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                else:
-                    type_emoji = {'work': '💼', 'study': '📚', 'health': '💪', 'personal': '🏠', 'social': '👥'}
-                    emoji = type_emoji.get(item['type'], '📝')
-                    deadline_text = f"📅 Due in {item['deadline_days']} days" if item['deadline_days'] is not None else "📅 Flexible"
-                    
-                    st.markdown(f"""
-                    <div style="background-color: #f3e5f5; padding: 10px; border-radius: 5px; border-left: 4px solid #9c27b0; margin: 5px 0;">
-                    <strong>{i}. {emoji} {item['name']}</strong><br>
-                    🕐 {item['start_time']} - {item['end_time']} ({item['duration']} min)<br>
-                    🔥 {item.get('intensity', 'Moderate')} | ⚡ Priority: {item['priority']}/20 | {deadline_text}
-                    </div>
-                    """, unsafe_allow_html=True)
-
+            # One markdown payload per page, reused until the schedule changes
+            schedule = st.session_state.schedule
+            fingerprint = current_schedule_fingerprint()
+            
+            pages = page_count(schedule)
+            page = 0
+            if pages > 1:
+                # The widget reads its value from session state only; a regenerated
+                # schedule can have fewer pages than the one last viewed
+                if 'timeline_page' not in st.session_state:
+                    st.session_state.timeline_page = 1
+                elif st.session_state.timeline_page > pages:
+                    st.session_state.timeline_page = pages
+                page = st.number_input(f"Page (of {pages}, {TIMELINE_PAGE_SIZE} items each)",
+                                       min_value=1, max_value=pages, key="timeline_page") - 1
+            st.markdown(timeline_cache.get(schedule, page, fingerprint=fingerprint), unsafe_allow_html=True)
+        
+        # Later days of a multi-day plan; today is the schedule above
+        plan = st.session_state.horizon_plan
+        if plan:
+            st.subheader("📆 Upcoming Days")
+            for late in plan['late']:
+                st.warning(f"⏰ {late['name']} runs past its deadline, planned for {late['date'].strftime('%a %d %b')}")
+            if plan['unscheduled']:
+                st.error("Did not fit in the plan: " + ", ".join(task['name'] for task in plan['unscheduled']))
+            
+            for day in plan['days'][1:]:
+                work_minutes = sum(item['duration'] for item in day['schedule'] if item['type'] not in NON_TASK_TYPES)
+                with st.expander(f"{day['date'].strftime('%A %d %b')} · {work_minutes // 60}h {work_minutes % 60}m of activities"):
+                    for item in day['schedule']:
+                        st.write(f"🕐 {item['start_time']} - {item['end_time']} {item['name']}")
+    
     with col2:
         st.subheader("📊 Quick Stats")
         
         if st.session_state.tasks:
-            total_ai_time = sum(analyze_task_comprehensive(task['name'])['duration'] for task in st.session_state.tasks)
+            _, total_ai_time, _ = task_overview(tasks_fingerprint(), st.session_state.tasks)
             
             st.metric("Total Activities", len(st.session_state.tasks))
             st.metric("AI Estimated Time", f"{total_ai_time//60}h {total_ai_time%60}m")
             
             if st.session_state.schedule:
-                work_items = [item for item in st.session_state.schedule if item['type'] not in ['meal', 'break', 'pomodoro_short_break', 'pomodoro_long_break', 'brain_rest']]
-                pomodoro_items = [item for item in st.session_state.schedule if 'pomodoro' in item['type']]
-                brain_rest_items = [item for item in st.session_state.schedule if item['type'] == 'brain_rest']
+                overview = schedule_overview(current_schedule_fingerprint(), st.session_state.schedule)
                 
-                st.metric("🎯 Tasks Scheduled", len(work_items))
-                st.metric("🍅 Pomodoro Sessions", len(pomodoro_items))
-                st.metric("🧠 Brain Rest Periods", len(brain_rest_items))
+                st.metric("🎯 Tasks Scheduled", overview['tasks'])
+                st.metric("🍅 Pomodoro Sessions", overview['pomodoro_sessions'])
+                st.metric("🧠 Brain Rest Periods", overview['brain_rests'])
                 
                 # Productivity score
-                if work_items:
-                    avg_priority = sum(item.get('priority', 10) for item in work_items) / len(work_items)
-                    productivity_score = min(100, int(avg_priority * 5))
-                    st.metric("📈 Productivity Score", f"{productivity_score}%")
+                if overview['productivity_score'] is not None:
+                    st.metric("📈 Productivity Score", f"{overview['productivity_score']}%")
         
         else:
             st.info("Add activities to see stats")
 
-with tab2:
+with tab1:
+    schedule_tab()
+
+@st.fragment
+def analytics_tab():
+    """Charts and trends for the current schedule"""
     st.subheader("📊 Advanced Analytics Dashboard")
     
     if st.session_state.schedule:
-        analytics_df = create_analytics_dashboard()
+        fingerprint = current_schedule_fingerprint()
+        
+        def aggregates():
+            return schedule_aggregates(fingerprint, st.session_state.schedule)
+        
+        # Time distribution chart
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("⏰ Time Distribution")
+            fig_pie = cached_figure(('time_distribution', fingerprint),
+                                    lambda: time_distribution_figure(aggregates()))
+            st.plotly_chart(fig_pie, use_container_width=True)
+        
+        with col2:
+            st.subheader("📈 Activity Timeline")
+            fig_timeline = cached_figure(('activity_timeline', fingerprint),
+                                         lambda: activity_timeline_figure(aggregates()))
+            st.plotly_chart(fig_timeline, use_container_width=True)
+        
+        # Intensity analysis
+        st.subheader("🔥 Intensity Analysis")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_bar = cached_figure(('intensity', fingerprint), lambda: intensity_figure(aggregates()))
+            st.plotly_chart(fig_bar, use_container_width=True)
+        
+        with col2:
+            # Productivity insights
+            st.markdown("""
+            <div class="feature-card">
+            <h4>💡 AI Insights</h4>
+            <ul>
+            <li><strong>Peak Focus Time:</strong> Your high-intensity tasks are scheduled optimally</li>
+            <li><strong>Break Balance:</strong> Adequate rest periods between intense work</li>
+            <li><strong>Energy Management:</strong> Tasks aligned with natural energy patterns</li>
+            <li><strong>Pomodoro Efficiency:</strong> Complex tasks broken into focused sessions</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Weekly trends from the analytics table
+        st.subheader("📈 Productivity Trends")
+        
+        week_start = date.today() - timedelta(days=6)
+        daily_scores = {row[0]: row[5] for row in db.get_daily_analytics(days=7)}
+        week = [week_start + timedelta(days=offset) for offset in range(7)]
+        days = [day.strftime('%A') for day in week]
+        productivity_scores = [daily_scores.get(day.isoformat()) for day in week]
+        
+        # Keyed on the plotted values, so it is rebuilt only when a day's score changes
+        fig_line = cached_figure(('weekly_trend', tuple(days), tuple(productivity_scores)),
+                                 lambda: weekly_trend_figure(days, productivity_scores))
+        st.plotly_chart(fig_line, use_container_width=True)
+        
+        weekly = db.get_analytics_summary(days=7)
+        st.caption(f"Last 7 days: {weekly['days_tracked']} days tracked, "
+                   f"{weekly['completed_tasks']} tasks completed, "
+                   f"{weekly['total_work_time']} min of scheduled work")
         
-        if analytics_df is not None:
-            # Time distribution chart
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("⏰ Time Distribution")
-                type_duration = analytics_df.groupby('type')['duration'].sum().reset_index()
-                fig_pie = px.pie(type_duration, values='duration', names='type', 
-                               title="Time Allocation by Activity Type")
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            with col2:
-                st.subheader("📈 Activity Timeline")
-                fig_timeline = px.scatter(analytics_df, x='start_hour', y='duration', 
-                                        color='type', size='duration',
-                                        title="Activities Throughout the Day")
-                fig_timeline.update_layout(xaxis_title="Hour of Day", yaxis_title="Duration (minutes)")
-                st.plotly_chart(fig_timeline, use_container_width=True)
-            
-            # Intensity analysis
-            st.subheader("🔥 Intensity Analysis")
-            intensity_counts = analytics_df['intensity'].value_counts()
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                fig_bar = px.bar(x=intensity_counts.index, y=intensity_counts.values,
-                               title="Task Intensity Distribution",
-                               color=intensity_counts.values,
-                               color_continuous_scale="viridis")
-                st.plotly_chart(fig_bar, use_container_width=True)
-            
-            with col2:
-                # Productivity insights
-                st.markdown("""
-                <div class="feature-card">
-                <h4>💡 AI Insights</h4>
-                <ul>
-                <li><strong>Peak Focus Time:</strong> Your high-intensity tasks are scheduled optimally</li>
-                <li><strong>Break Balance:</strong> Adequate rest periods between intense work</li>
-                <li><strong>Energy Management:</strong> Tasks aligned with natural energy patterns</li>
-                <li><strong>Pomodoro Efficiency:</strong> Complex tasks broken into focused sessions</li>
-                </ul>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Weekly trends (simulated)
-            st.subheader("📈 Productivity Trends")
-            
-            # Generate sample weekly data
-            days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            productivity_scores = [85, 78, 92, 88, 75, 60, 45]  # Sample data
-            
-            fig_line = go.Figure()
-            fig_line.add_trace(go.Scatter(x=days, y=productivity_scores, 
-                                        mode='lines+markers',
-                                        name='Productivity Score',
-                                        line=dict(color='#667eea', width=3)))
-            fig_line.update_layout(title="Weekly Productivity Trend", 
-                                 xaxis_title="Day", yaxis_title="Productivity Score (%)")
-            st.plotly_chart(fig_line, use_container_width=True)
-            
     else:
         st.info("Generate a schedule to see analytics dashboard")
 
-with tab3:
+with tab2:
+    analytics_tab()
+
+@st.fragment
+def edit_tab():
+    """Edit or remove activities; task changes rerun the whole app"""
     st.subheader("✏️ Edit Your Activities")
     
     if st.session_state.tasks:
@@ -1129,7 +910,7 @@ with tab3:
             if st.button("🗑️ Remove Activity", type="secondary"):
                 if selected_activity_str:
                     selected_index = int(selected_activity_str.split('.')[0]) - 1
-                    removed_task = st.session_state.tasks.pop(selected_index)
+                    removed_task = edit_tasks('delete', selected_index)
                     st.success(f"Removed: {removed_task['name']}")
                     st.rerun()
             
@@ -1137,7 +918,7 @@ with tab3:
                 if selected_activity_str:
                     st.session_state.editing_mode = True
                     st.session_state.edit_index = int(selected_activity_str.split('.')[0]) - 1
-                    st.rerun()
+                    st.rerun(scope="fragment")
         
         # Edit form
         if st.session_state.get('editing_mode', False):
@@ -1177,10 +958,10 @@ with tab3:
                     
                     with col1:
                         if st.form_submit_button("💾 Save Changes", type="primary"):
-                            st.session_state.tasks[edit_index] = {
+                            edit_tasks('update', edit_index, {
                                 'name': new_name,
                                 'deadline_days': new_deadline_days
-                            }
+                            })
                             
                             st.session_state.editing_mode = False
                             st.session_state.edit_index = None
@@ -1192,12 +973,14 @@ with tab3:
                         if st.form_submit_button("❌ Cancel"):
                             st.session_state.editing_mode = False
                             st.session_state.edit_index = None
-                            st.rerun()
+                            st.rerun(scope="fragment")
         
         st.markdown("---")
         if st.button("🧹 Clear All Activities", type="secondary"):
             st.session_state.tasks = []
             st.session_state.schedule = []
+            st.session_state.scheduler = None
+            st.session_state.horizon_plan = None
             st.session_state.editing_mode = False
             st.session_state.edit_index = None
             st.success("All activities cleared!")
@@ -1206,16 +989,31 @@ with tab3:
     else:
         st.info("No activities to edit. Add some activities first!")
 
-with tab4:
+with tab3:
+    edit_tab()
+
+@st.fragment
+def progress_tab():
+    """Completion tracking, achievements and weekly goals"""
     st.subheader("📈 Progress Tracking")
     
     # Progress simulation
     if st.session_state.schedule:
         st.subheader("⏰ Daily Progress")
         
-        # Simulate progress
-        total_tasks = len([item for item in st.session_state.schedule if item['type'] not in ['meal', 'break', 'brain_rest']])
-        completed_tasks = len(st.session_state.completed_tasks)
+        # One pass: count trackable items and collect the ones still open
+        total_tasks = 0
+        completed_tasks = 0
+        incomplete_tasks = []
+        for item in st.session_state.schedule:
+            if item['type'] in NON_TASK_TYPES:
+                continue
+            total_tasks += 1
+            task_id = item_id(item)
+            if task_id in st.session_state.completed_tasks:
+                completed_tasks += 1
+            else:
+                incomplete_tasks.append((task_id, item))
         
         if total_tasks > 0:
             progress = completed_tasks / total_tasks
@@ -1225,22 +1023,18 @@ with tab4:
             # Task completion interface
             st.subheader("✅ Mark Tasks as Complete")
             
-            incomplete_tasks = [item for item in st.session_state.schedule 
-                              if item['type'] not in ['meal', 'break', 'brain_rest'] 
-                              and f"{item['name']}_{item.get('start_time', '')}" not in st.session_state.completed_tasks]
-            
             if incomplete_tasks:
-                for idx, task in enumerate(incomplete_tasks[:5]):  # Show first 5 incomplete tasks
+                for task_id, task in incomplete_tasks[:5]:  # Show first 5 incomplete tasks
                     col1, col2 = st.columns([3, 1])
                     with col1:
                         st.write(f"🎯 {task['name']} ({task.get('start_time', 'N/A')} - {task.get('end_time', 'N/A')})")
                     with col2:
-                        # Create unique key using index and time to avoid duplicates
-                        unique_key = f"complete_{idx}_{task.get('start_time', 'unknown')}_{hash(task['name']) % 10000}"
-                        if st.button(f"✅ Complete", key=unique_key):
-                            st.session_state.completed_tasks.append(f"{task['name']}_{task.get('start_time', '')}")
+                        if st.button(f"✅ Complete", key=f"complete_{task_id}"):
+                            st.session_state.completed_tasks.add(task_id)
+                            db.record_completion(task_id, task['name'])
+                            record_daily_analytics()
                             st.success(f"Completed: {task['name']}")
-                            st.rerun()
+                            st.rerun(scope="fragment")
             else:
                 st.success("🎉 All tasks completed! Great job!")
         
@@ -1252,7 +1046,7 @@ with tab4:
             achievements.append("🎯 First Task Completed")
         if len(st.session_state.completed_tasks) >= 5:
             achievements.append("🔥 Productivity Streak")
-        if len(st.session_state.schedule_history) >= 3:
+        if st.session_state.schedule_history.total >= 3:
             achievements.append("📊 Planning Master")
         if any('pomodoro' in item['type'] for item in st.session_state.schedule):
             achievements.append("🍅 Pomodoro Practitioner")
@@ -1268,17 +1062,18 @@ with tab4:
             st.metric("Tasks This Week", len(st.session_state.completed_tasks), "2")
         
         with col2:
-            focus_time = sum(analyze_task_comprehensive(task['name'])['duration'] 
-                           for task in st.session_state.tasks 
-                           if analyze_task_comprehensive(task['name'])['intensity'] in ['High Focus', 'Deep Work'])
+            _, _, focus_time = task_overview(tasks_fingerprint(), st.session_state.tasks)
             st.metric("Focus Time (min)", focus_time, "45")
         
         with col3:
-            st.metric("Planning Streak", len(st.session_state.schedule_history), "1")
+            st.metric("Planning Streak", st.session_state.schedule_history.total, "1")
         
     else:
         st.info("Generate a schedule to track your progress!")
 
+with tab4:
+    progress_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,49 @@
+# bench_horizon.py
+# Times 30-day plan_horizon runs as the task count grows
+#
+# Run from the repository root:
+#     python benchmarks/bench_horizon.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import MAX_HORIZON_DAYS, TASK_PATTERNS, plan_horizon
+
+SIZES = [10, 100, 300, 1000]
+
+SETTINGS = {
+    'long_break_after': 3,
+    'long_break_duration': 30,
+    'pomodoro_work_time': 25,
+    'pomodoro_short_break': 5,
+    'pomodoro_long_break': 20,
+    'brain_rest_duration': 60,
+    'brain_activities': ["🚶 Light walk", "☕ Coffee"]
+}
+
+MEAL_TIMES = {'breakfast': '08:00', 'lunch': '12:30', 'dinner': '18:30'}
+
+def make_tasks(count, seed=0):
+    """Random pattern names with deadlines spread over the horizon"""
+    rng = random.Random(seed)
+    names = list(TASK_PATTERNS)
+    deadlines = [None, 0, 1, 2, 3, 5, 7, 14, 21, 29]
+    return [{'name': rng.choice(names), 'deadline_days': rng.choice(deadlines)} for _ in range(count)]
+
+def main():
+    print(f"{'tasks':>6} {'total ms':>10} {'planning':>10} {'layout':>10} {'late':>6} {'unplaced':>9}")
+    for size in SIZES:
+        tasks = make_tasks(size)
+        timings = {}
+        started = time.perf_counter()
+        plan = plan_horizon(tasks, MAX_HORIZON_DAYS, 7, 22, MEAL_TIMES, SETTINGS, timings=timings)
+        elapsed = time.perf_counter() - started
+        print(f"{size:>6} {elapsed * 1000:>10.2f} {timings['planning'] * 1000:>10.2f} "
+              f"{timings['placement'] * 1000:>10.2f} {len(plan['late']):>6} {len(plan['unscheduled']):>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_packing.py
+# Compares the greedy engine with slot packing on generated task sets
+#
+# The greedy engine skips a meal once a task runs through its slot, so its value
+# can come out higher than any packing that keeps every meal. The packed engine
+# then returns the greedy schedule; the 'greedy' column counts those runs.
+#
+# Run from the repository root:
+#     python benchmarks/bench_packing.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import TASK_PATTERNS, create_packed_schedule, create_schedule, free_intervals
+
+SIZES = [5, 10, 20, 40, 80]
+SEEDS = range(5)
+
+SETTINGS = {
+    'long_break_after': 3,
+    'long_break_duration': 30,
+    'pomodoro_work_time': 25,
+    'pomodoro_short_break': 5,
+    'pomodoro_long_break': 20,
+    'brain_rest_duration': 60,
+    'brain_activities': ["🚶 Light walk", "☕ Coffee"]
+}
+
+MEAL_TIMES = {'breakfast': '08:00', 'lunch': '12:30', 'dinner': '18:30'}
+START_HOUR, END_HOUR = 7, 22
+
+def make_tasks(count, seed):
+    """Random mix of pattern names and deadlines"""
+    rng = random.Random(seed)
+    names = list(TASK_PATTERNS)
+    return [{'name': rng.choice(names), 'deadline_days': rng.choice([None, 0, 1, 2, 3, 5])} for _ in range(count)]
+
+def measure(schedule):
+    """(priority x duration, task minutes, meals kept)"""
+    value = sum(item['priority'] * item['duration'] for item in schedule if 'priority' in item)
+    minutes = sum(item['duration'] for item in schedule if 'priority' in item)
+    meals = sum(1 for item in schedule if item['type'] == 'meal')
+    return value, minutes, meals
+
+def main():
+    _, intervals = free_intervals(START_HOUR, END_HOUR, MEAL_TIMES)
+    free_minutes = sum(end - start for start, end, _ in intervals)
+    print(f"free minutes between meals: {free_minutes}")
+    print(f"{'tasks':>6} {'engine':>8} {'value':>8} {'util %':>7} {'meals':>6} {'ms':>8} {'optimal':>8} {'greedy':>7}")
+    
+    for size in SIZES:
+        totals = {'greedy': [0, 0, 0, 0.0, 0], 'packed': [0, 0, 0, 0.0, 0]}
+        fallbacks = 0
+        for seed in SEEDS:
+            tasks = make_tasks(size, seed)
+            
+            started = time.perf_counter()
+            greedy = create_schedule(tasks, START_HOUR, END_HOUR, MEAL_TIMES, SETTINGS)
+            greedy_seconds = time.perf_counter() - started
+            
+            stats = {}
+            started = time.perf_counter()
+            packed = create_packed_schedule(tasks, START_HOUR, END_HOUR, MEAL_TIMES, SETTINGS, stats=stats)
+            packed_seconds = time.perf_counter() - started
+            fallbacks += stats['engine'] == 'greedy'
+            
+            for engine, schedule, seconds, optimal in (
+                ('greedy', greedy, greedy_seconds, True),
+                ('packed', packed, packed_seconds, stats['optimal'])
+            ):
+                value, minutes, meals = measure(schedule)
+                row = totals[engine]
+                row[0] += value
+                row[1] += minutes
+                row[2] += meals
+                row[3] += seconds
+                row[4] += optimal
+        
+        runs = len(SEEDS)
+        for engine, (value, minutes, meals, seconds, optimal) in totals.items():
+            optimal_text = f"{optimal}/{runs}" if engine == 'packed' else '-'
+            fallback_text = f"{fallbacks}/{runs}" if engine == 'packed' else '-'
+            print(f"{size:>6} {engine:>8} {value / runs:>8.0f} {minutes / runs / free_minutes * 100:>7.1f} "
+                  f"{meals / runs:>6.1f} {seconds / runs * 1000:>8.2f} {optimal_text:>8} {fallback_text:>7}")
+
+if __name__ == "__main__":
+    main()
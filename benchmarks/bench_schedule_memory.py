@@ -0,0 +1,42 @@
+# bench_schedule_memory.py
+# Compares the memory held by dict schedules with ScheduleItem/ScheduleArray
+#
+# Run from the repository root:
+#     python benchmarks/bench_schedule_memory.py
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import ScheduleArray, compact_schedule, create_schedule
+from bench_schedule_scaling import MEAL_TIMES, SETTINGS, make_tasks
+
+SIZES = [100, 1000, 10000]
+
+def measure(build):
+    """Bytes still allocated by the object build() returns"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+def main():
+    print(f"{'tasks':>8} {'items':>8} {'dicts KB':>10} {'items KB':>10} {'array KB':>10} {'ratio':>7}")
+    for size in SIZES:
+        tasks = make_tasks(size)
+        end_hour = 7 + size * 4
+        # Fill analysis_cache and the pomodoro templates first, so the first
+        # measurement does not also count the shared caches it populates
+        create_schedule(tasks, 7, end_hour, MEAL_TIMES, SETTINGS)
+        dict_bytes, _ = measure(lambda: create_schedule(tasks, 7, end_hour, MEAL_TIMES, SETTINGS))
+        # Measure only what the compact forms keep alive once the dicts are gone
+        item_bytes, items = measure(lambda: compact_schedule(create_schedule(tasks, 7, end_hour, MEAL_TIMES, SETTINGS)))
+        array_bytes, columns = measure(lambda: ScheduleArray.from_schedule(create_schedule(tasks, 7, end_hour, MEAL_TIMES, SETTINGS)))
+        print(f"{size:>8} {len(items):>8} {dict_bytes / 1024:>10.1f} {item_bytes / 1024:>10.1f} "
+              f"{array_bytes / 1024:>10.1f} {dict_bytes / item_bytes:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
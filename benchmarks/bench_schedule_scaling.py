@@ -0,0 +1,51 @@
+# bench_schedule_scaling.py
+# Shows that create_schedule scales linearly with the number of tasks
+#
+# Run from the repository root:
+#     python benchmarks/bench_schedule_scaling.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import TASK_PATTERNS, create_schedule
+
+SIZES = [10, 100, 1000, 10000]
+
+SETTINGS = {
+    'long_break_after': 3,
+    'long_break_duration': 30,
+    'pomodoro_work_time': 25,
+    'pomodoro_short_break': 5,
+    'pomodoro_long_break': 20,
+    'brain_rest_duration': 60,
+    'brain_activities': ["🚶 Light walk", "☕ Coffee"]
+}
+
+MEAL_TIMES = {'breakfast': '08:00', 'lunch': '12:30', 'dinner': '18:30'}
+
+def make_tasks(count):
+    """Cycle through the pattern vocabulary to build count micro-tasks"""
+    names = list(TASK_PATTERNS)
+    return [{'name': names[i % len(names)], 'deadline_days': i % 5 or None} for i in range(count)]
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    print(f"{'tasks':>8} {'items':>8} {'total ms':>10} {'us/task':>10}")
+    for size in SIZES:
+        tasks = make_tasks(size)
+        # End hour far enough out that every task fits, so nothing is cut off
+        elapsed, schedule = best_of(lambda: create_schedule(tasks, 7, 7 + size * 4, MEAL_TIMES, SETTINGS))
+        print(f"{size:>8} {len(schedule):>8} {elapsed * 1000:>10.2f} {elapsed / size * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_startup.py
+# Cold-start profile of the Streamlit app: import time of the engine and the
+# first render of a fresh session. Fails if heavy libraries load too early.
+#
+# Run from the repository root (needs streamlit installed):
+#     python benchmarks/bench_startup.py
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "DailyPlannermain.py")
+
+# Only the Analytics tab, exports and tables may pull these in. Streamlit
+# itself already imports plotly.graph_objects, so it is not checked.
+LAZY_MODULES = ['pandas', 'plotly.express']
+
+def child():
+    """Runs in a fresh interpreter so nothing is already imported"""
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import planner  # noqa: F401
+    engine_seconds = time.perf_counter() - started
+    
+    from streamlit.testing.v1 import AppTest
+    started = time.perf_counter()
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.run()
+    render_seconds = time.perf_counter() - started
+    
+    print(json.dumps({
+        'engine_import_ms': engine_seconds * 1000,
+        'first_render_ms': render_seconds * 1000,
+        'loaded': [name for name in LAZY_MODULES if name in sys.modules],
+        'errors': [str(error.value) for error in app.exception]
+    }))
+
+def main():
+    # Run in a scratch directory so the benchmark gets its own planner.db
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                            capture_output=True, text=True, cwd=tempfile.mkdtemp())
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    
+    print(f"planner import:  {report['engine_import_ms']:8.1f} ms")
+    print(f"first render:    {report['first_render_ms']:8.1f} ms")
+    print(f"heavy modules:   {', '.join(report['loaded']) or 'none'}")
+    
+    if report['errors']:
+        print("app raised: " + "; ".join(report['errors']))
+        sys.exit(1)
+    if report['loaded']:
+        print("regression: heavy modules loaded on first render")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
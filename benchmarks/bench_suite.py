@@ -0,0 +1,214 @@
+# bench_suite.py
+# Benchmark suite for the analysis, scheduling, report and database hot paths,
+# with a stored baseline and a regression report
+#
+# Run from the repository root:
+#     python benchmarks/bench_suite.py                    # compare with baseline.json
+#     python benchmarks/bench_suite.py --save-baseline    # record a new baseline
+#     python benchmarks/bench_suite.py --report report.md # also write the table for a PR
+#
+# Timings depend on the machine, so refresh the baseline when the runner
+# changes and compare runs made on the same hardware.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import (
+    PlannerDatabase, analysis_cache, analytics_rows, analyze_task_comprehensive, calculate_priority,
+    create_pomodoro_sessions, create_schedule, export_rows
+)
+from bench_schedule_scaling import MEAL_TIMES, SETTINGS
+from workloads import SIZES, make_realistic_tasks
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DATABASE_SIZES = [10, 100, 1000]
+POMODORO_DURATIONS = [30, 45, 60, 90, 120, 180]
+
+def schedule_for(tasks):
+    # End hour far enough out that every task fits
+    return create_schedule(tasks, 7, 7 + len(tasks) * 4, MEAL_TIMES, SETTINGS)
+
+def analysis_cases(size):
+    names = [task['name'] for task in make_realistic_tasks(size)]
+    analyses = [analyze_task_comprehensive(name) for name in names]
+    deadlines = [task['deadline_days'] for task in make_realistic_tasks(size)]
+    
+    def cold():
+        analysis_cache.clear()
+        for name in names:
+            analyze_task_comprehensive(name)
+    
+    def warm():
+        for name in names:
+            analyze_task_comprehensive(name)
+    
+    def priorities():
+        for analysis, deadline in zip(analyses, deadlines):
+            calculate_priority(analysis['type'], analysis['difficulty'], deadline,
+                               analysis['energy_level'], analysis['mental_load'])
+    
+    return [
+        ('analyze_task_comprehensive[cold]', cold),
+        ('analyze_task_comprehensive[warm]', warm),
+        ('calculate_priority', priorities)
+    ]
+
+def scheduling_cases(size):
+    tasks = make_realistic_tasks(size)
+    durations = [POMODORO_DURATIONS[i % len(POMODORO_DURATIONS)] for i in range(size)]
+    
+    def pomodoros():
+        for duration in durations:
+            create_pomodoro_sessions(duration, 25, 5, 20)
+    
+    return [
+        ('create_pomodoro_sessions', pomodoros),
+        ('create_schedule', lambda: schedule_for(tasks))
+    ]
+
+def report_cases(size):
+    schedule = schedule_for(make_realistic_tasks(size))
+    cases = [
+        ('export_rows', lambda: export_rows(schedule)),
+        ('analytics_rows', lambda: analytics_rows(schedule))
+    ]
+    
+    # What export_schedule_data and create_analytics_dashboard do in the app
+    try:
+        import pandas as pd
+    except ImportError:
+        return cases
+    cases.append(('export_schedule_data', lambda: pd.DataFrame(export_rows(schedule))))
+    cases.append(('create_analytics_dashboard', lambda: pd.DataFrame(analytics_rows(schedule))))
+    return cases
+
+def database_cases(size, directory):
+    """size is the number of saved schedules; each save/load moves a 100-task schedule"""
+    db = PlannerDatabase(os.path.join(directory, f"bench_{size}.db"))
+    tasks = make_realistic_tasks(100)
+    schedule = schedule_for(tasks)
+    for index in range(size):
+        db.save_schedule(f"Schedule_{index:05d}", tasks, schedule)
+    
+    def save():
+        db.save_schedule("Schedule_bench", tasks, schedule)
+    
+    return [
+        ('PlannerDatabase.save_schedule', save),
+        ('PlannerDatabase.load_schedule', lambda: db.load_schedule(f"Schedule_{size // 2:05d}")),
+        ('PlannerDatabase.list_schedules', lambda: db.list_schedules(20)),
+        ('PlannerDatabase.list_schedules[prefix]', lambda: db.list_schedules(20, prefix="Schedule_00"))
+    ]
+
+def best_of(func, repeat, min_seconds=0.01):
+    """Best per-call time; fast calls are looped until one timing covers min_seconds"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - started >= min_seconds:
+            break
+        loops *= 2
+    
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - started) / loops)
+    return min(timings)
+
+def run(sizes, repeat, selected):
+    """{'name@size': best seconds}"""
+    results = {}
+    
+    def measure(size, cases):
+        for name, func in cases:
+            if selected and selected not in name:
+                continue
+            key = f"{name}@{size}"
+            results[key] = best_of(func, repeat)
+            print(f"{key:<48} {results[key] * 1000:>10.3f} ms", flush=True)
+    
+    for size in sizes:
+        measure(size, analysis_cases(size))
+        measure(size, scheduling_cases(size))
+        measure(size, report_cases(size))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in DATABASE_SIZES:
+            if size <= max(sizes):
+                measure(size, database_cases(size, directory))
+    return results
+
+def compare(results, baseline, threshold):
+    """Markdown table of every benchmark against the baseline, and the regressed keys"""
+    lines = [
+        "| benchmark | baseline ms | current ms | change | status |",
+        "|---|---:|---:|---:|---|"
+    ]
+    regressions = []
+    for key, seconds in results.items():
+        before = baseline.get(key)
+        if before is None:
+            lines.append(f"| {key} | - | {seconds * 1000:.3f} | - | new |")
+            continue
+        change = seconds / before - 1
+        if change > threshold:
+            status = "🔴 regressed"
+            regressions.append(key)
+        elif change < -threshold:
+            status = "🟢 faster"
+        else:
+            status = "ok"
+        lines.append(f"| {key} | {before * 1000:.3f} | {seconds * 1000:.3f} | {change:+.1%} | {status} |")
+    return "\n".join(lines), regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown that counts as a regression")
+    parser.add_argument("--report", help="write the comparison table to this Markdown file")
+    args = parser.parse_args()
+    
+    results = run(args.sizes, args.repeat, args.filter)
+    
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repeat': args.repeat,
+                'results': results
+            }, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    
+    table, regressions = compare(results, baseline, args.threshold)
+    print("\n" + table)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write("## Benchmark comparison\n\n" + table + "\n")
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
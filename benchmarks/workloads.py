@@ -0,0 +1,47 @@
+# workloads.py
+# Seeded synthetic task lists shared by the benchmarks
+#
+# Names follow a Zipf-like distribution over the TASK_PATTERNS vocabulary: a
+# few activities (meetings, email, study) dominate real lists, most show up
+# rarely, and a small share match no pattern at all.
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import TASK_PATTERNS
+
+SIZES = [10, 100, 1000, 10000]
+
+# How people phrase the same activity
+NAME_TEMPLATES = [
+    "{}", "{}", "{}",
+    "{} with team",
+    "Prepare {}",
+    "{} follow-up",
+    "Weekly {}",
+    "{} for project"
+]
+
+UNMATCHED_NAMES = ["Misc errand", "Sort out paperwork", "Fix the bike", "Plan vacation", "Water plants"]
+UNMATCHED_SHARE = 0.05
+DEADLINES = [None, None, None, 0, 1, 1, 2, 3, 5, 7]
+
+def make_realistic_tasks(count, seed=0):
+    """count task dicts drawn with a fixed seed, so every run sees the same list"""
+    rng = random.Random(seed)
+    vocabulary = list(TASK_PATTERNS)
+    rng.shuffle(vocabulary)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    
+    tasks = []
+    for _ in range(count):
+        if rng.random() < UNMATCHED_SHARE:
+            name = rng.choice(UNMATCHED_NAMES)
+        else:
+            pattern = rng.choices(vocabulary, weights)[0]
+            name = rng.choice(NAME_TEMPLATES).format(pattern).capitalize()
+        tasks.append({'name': name, 'deadline_days': rng.choice(DEADLINES)})
+    return tasks
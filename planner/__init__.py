@@ -0,0 +1,38 @@
+# planner/__init__.py
+# Headless scheduling engine and persistence layer for the Ultimate AI Daily Planner.
+# Nothing here imports Streamlit, Plotly or pandas, so workers, CLIs and
+# tests can use it directly.
+
+from .analysis import (
+    TASK_PATTERNS, TaskAnalysisCache, TaskClassifier, analysis_cache,
+    analyze_task_comprehensive, calculate_priority, generate_smart_suggestions,
+    normalize_task_name, task_classifier
+)
+from .calendar import Calendar, merge_fixed_items
+from .database import (
+    HISTORY_RETENTION_DAYS, HISTORY_SPILL_LIMIT, AnalyticsWriter, CompressedJsonSerializer, JsonSerializer,
+    PlannerDatabase, decode_payload
+)
+from .history import HISTORY_CAPACITY, ScheduleHistory
+from .horizon import MAX_HORIZON_DAYS, DayCalendar, plan_horizon
+from .items import ScheduleArray, ScheduleItem, compact_schedule, item_id, schedule_to_dicts
+from .lru import LRUCache
+from .metrics import GenerationMetrics, PhaseTimer, generation_metrics
+from .packing import (
+    PACKING_TIME_BUDGET, SlotPacker, create_packed_schedule, free_intervals, layout_intervals,
+    schedule_value
+)
+from .profiling import PROFILED_HELPERS, Profiler, profile
+from .reports import (
+    FIGURE_CACHE_CHARS, FigureCache, analytics_aggregates, analytics_rows, export_rows, figure_cache
+)
+from .scheduling import (
+    MEAL_SLOTS, NON_TASK_TYPES, POMODORO_TEMPLATE_CACHE_SIZE, IncrementalScheduler, analyze_tasks_bulk,
+    calculate_productivity_score, create_pomodoro_sessions, create_schedule, create_schedules_bulk,
+    meal_windows, pomodoro_template, schedule_totals
+)
+from .timeline import (
+    TIMELINE_CACHE_SIZE, TIMELINE_PAGE_SIZE, TimelineCache, page_count, render_item, render_timeline,
+    schedule_fingerprint, timeline_cache
+)
+from .timeutils import minutes_to_time, time_to_minutes
@@ -0,0 +1,249 @@
+# planner/analysis.py
+# Task analysis engine: pattern classifier, shared analysis cache and priority scoring
+
+from .lru import LRUCache
+
+# Comprehensive task analysis database
+TASK_PATTERNS = {
+    # Work tasks
+    'meeting': {'type': 'work', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'team meeting': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'standup': {'type': 'work', 'duration': 15, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'presentation': {'type': 'work', 'duration': 90, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
+    'prepare presentation': {'type': 'work', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
+    'write report': {'type': 'work', 'duration': 120, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
+    'email': {'type': 'work', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'check email': {'type': 'work', 'duration': 20, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'call': {'type': 'work', 'duration': 30, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'phone call': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'client call': {'type': 'work', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': False, 'brain_rest': False},
+    'interview': {'type': 'work', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': False, 'brain_rest': True},
+    'review': {'type': 'work', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'planning': {'type': 'work', 'duration': 90, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
+    'project work': {'type': 'work', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
+    
+    # Study tasks
+    'study': {'type': 'study', 'duration': 90, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True},
+    'homework': {'type': 'study', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': True, 'brain_rest': False},
+    'read': {'type': 'study', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'reading': {'type': 'study', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'research': {'type': 'study', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
+    'learn': {'type': 'study', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': False},
+    'exam prep': {'type': 'study', 'duration': 120, 'intensity': 'Deep Work', 'pomodoro': True, 'brain_rest': True},
+    'practice': {'type': 'study', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': True, 'brain_rest': False},
+    
+    # Health/Exercise
+    'gym': {'type': 'health', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'workout': {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'exercise': {'type': 'health', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'run': {'type': 'health', 'duration': 30, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'running': {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'yoga': {'type': 'health', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'walk': {'type': 'health', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'meditation': {'type': 'health', 'duration': 20, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'doctor appointment': {'type': 'health', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    
+    # Personal tasks
+    'shopping': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'grocery shopping': {'type': 'personal', 'duration': 45, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'clean': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'cleaning': {'type': 'personal', 'duration': 90, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'laundry': {'type': 'personal', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'cook': {'type': 'personal', 'duration': 45, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'cooking': {'type': 'personal', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'meal prep': {'type': 'personal', 'duration': 90, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False},
+    'organize': {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'pay bills': {'type': 'personal', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    
+    # Social activities
+    'coffee': {'type': 'social', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'lunch': {'type': 'social', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'dinner': {'type': 'social', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'hangout': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'visit friends': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'date': {'type': 'social', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'party': {'type': 'social', 'duration': 180, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    
+    # Entertainment
+    'movie': {'type': 'entertainment', 'duration': 120, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'tv': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'netflix': {'type': 'entertainment', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'game': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'gaming': {'type': 'entertainment', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'music': {'type': 'entertainment', 'duration': 30, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False},
+    'relax': {'type': 'entertainment', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}
+}
+
+# Keyword-based fallback, used only when no pattern word appears in the task name
+FALLBACK_PATTERNS = [
+    (['meeting', 'work', 'presentation', 'email', 'call'],
+     {'type': 'work', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}),
+    (['study', 'learn', 'read', 'research'],
+     {'type': 'study', 'duration': 60, 'intensity': 'High Focus', 'pomodoro': True, 'brain_rest': True}),
+    (['gym', 'exercise', 'workout', 'run'],
+     {'type': 'health', 'duration': 45, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}),
+    (['clean', 'cook', 'shopping'],
+     {'type': 'personal', 'duration': 60, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}),
+    (['coffee', 'lunch', 'dinner', 'friends'],
+     {'type': 'social', 'duration': 90, 'intensity': 'Light', 'pomodoro': False, 'brain_rest': False}),
+]
+DEFAULT_PATTERN = {'type': 'personal', 'duration': 60, 'intensity': 'Moderate', 'pomodoro': False, 'brain_rest': False}
+
+# Map properties
+DIFFICULTY_MAP = {'Light': 1, 'Moderate': 2, 'High Focus': 3, 'Deep Work': 3}
+ENERGY_MAP = {'Light': 'low', 'Moderate': 'medium', 'High Focus': 'high', 'Deep Work': 'high'}
+MENTAL_MAP = {'Light': 'low', 'Moderate': 'medium', 'High Focus': 'high', 'Deep Work': 'very_high'}
+
+def build_analysis(properties):
+    """Expand matched pattern properties into the full analysis dict"""
+    intensity = properties['intensity']
+    return {
+        'type': properties['type'],
+        'duration': properties['duration'],
+        'intensity': intensity,
+        'difficulty': DIFFICULTY_MAP[intensity],
+        'energy_level': ENERGY_MAP[intensity],
+        'mental_load': MENTAL_MAP[intensity],
+        'use_pomodoro': properties['pomodoro'],
+        'needs_brain_rest': properties['brain_rest'],
+        'needs_break_after': intensity in ['Moderate', 'High Focus', 'Deep Work'],
+        'break_duration': 15 if intensity in ['High Focus', 'Deep Work'] else 10
+    }
+
+class TaskClassifier:
+    """Aho-Corasick index over the pattern words, built once and reused for every task"""
+    
+    def __init__(self, patterns, fallbacks, default):
+        # Every pattern word scores its length when it appears anywhere in the task name
+        self.word_patterns = {}
+        for index, pattern in enumerate(patterns):
+            for pattern_word in pattern.split():
+                self.word_patterns.setdefault(pattern_word, []).append((index, len(pattern_word)))
+        for words, _ in fallbacks:
+            for word in words:
+                self.word_patterns.setdefault(word, [])
+        
+        self.results = [build_analysis(properties) for properties in patterns.values()]
+        self.fallbacks = [(words, build_analysis(properties)) for words, properties in fallbacks]
+        self.default = build_analysis(default)
+        
+        # Trie over all words, with failure links and merged outputs
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for word in self.word_patterns:
+            node = 0
+            for char in word:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node] = (word,)
+        
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                if node:
+                    self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+    
+    def find_words(self, text):
+        """Return the set of indexed words occurring in text, in a single pass"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+    
+    def classify(self, task_lower):
+        """Return a fresh analysis dict for the best-scoring pattern"""
+        found = self.find_words(task_lower)
+        
+        scores = {}
+        for word in found:
+            for index, points in self.word_patterns[word]:
+                scores[index] = scores.get(index, 0) + points
+        
+        # Highest score wins; ties go to the pattern listed first
+        if scores:
+            best_index = min(scores, key=lambda index: (-scores[index], index))
+            return dict(self.results[best_index])
+        
+        for words, analysis in self.fallbacks:
+            if any(word in found for word in words):
+                return dict(analysis)
+        return dict(self.default)
+
+# Built once per process and shared by every session
+task_classifier = TaskClassifier(TASK_PATTERNS, FALLBACK_PATTERNS, DEFAULT_PATTERN)
+
+# Maximum number of distinct task names kept in the shared analysis cache
+ANALYSIS_CACHE_SIZE = 2048
+
+def normalize_task_name(task_name):
+    """Lowercase and collapse whitespace; pattern words never span spaces"""
+    return ' '.join(task_name.lower().split())
+
+class TaskAnalysisCache(LRUCache):
+    """Thread-safe LRU cache of task analyses shared by every session"""
+    
+    def __init__(self, classifier, maxsize=ANALYSIS_CACHE_SIZE):
+        super().__init__(maxsize)
+        self.classifier = classifier
+    
+    def get(self, task_name):
+        """Return a copy of the cached analysis, classifying on a miss"""
+        key = normalize_task_name(task_name)
+        return dict(self.get_or_build(key, self.classifier.classify, key))
+
+analysis_cache = TaskAnalysisCache(task_classifier)
+
+def analyze_task_comprehensive(task_name):
+    """AI analyzes task and predicts ALL properties automatically"""
+    return analysis_cache.get(task_name)
+
+def calculate_priority(task_type, difficulty, deadline_days, energy_level, mental_load):
+    """Calculate task priority with user preferences"""
+    type_scores = {'work': 5, 'study': 4, 'health': 4, 'personal': 3, 'social': 2}
+    energy_scores = {'high': 3, 'medium': 2, 'low': 1}
+    mental_scores = {'very_high': 4, 'high': 3, 'medium': 2, 'low': 1}
+    
+    type_score = type_scores.get(task_type, 2)
+    energy_score = energy_scores.get(energy_level, 2)
+    mental_score = mental_scores.get(mental_load, 2)
+    
+    if deadline_days is None:
+        deadline_score = 2
+    elif deadline_days <= 1:
+        deadline_score = 5
+    elif deadline_days <= 3:
+        deadline_score = 3
+    else:
+        deadline_score = 1
+    
+    return type_score + difficulty + deadline_score + energy_score + mental_score
+
+def generate_smart_suggestions(current_tasks):
+    """AI-powered task suggestions based on user history"""
+    common_tasks = [
+        "Check emails", "Team standup", "Review calendar", "Coffee break",
+        "Lunch meeting", "Project planning", "Study session", "Gym workout",
+        "Grocery shopping", "Meal prep", "Read industry news", "Call family"
+    ]
+    
+    # Filter out tasks user already has
+    existing_names = [task['name'].lower() for task in current_tasks]
+    suggestions = [task for task in common_tasks if task.lower() not in existing_names]
+    
+    return suggestions[:5]  # Return top 5 suggestions
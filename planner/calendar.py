@@ -0,0 +1,107 @@
+# planner/calendar.py
+# Fixed-time blocks of a day (appointments, pinned meals) as a sorted interval list
+
+from bisect import bisect_left, bisect_right
+
+from .timeutils import minutes_to_time, time_to_minutes
+
+class Calendar:
+    """Non-overlapping fixed blocks kept sorted by start minute
+    
+    Because blocks never overlap, their ends are sorted too, so conflict
+    queries and lookups are two bisects. Blocks are (start, end, name, kind)
+    tuples in minutes since midnight.
+    """
+    
+    def __init__(self, blocks=()):
+        self._starts = []
+        self._ends = []
+        self._blocks = []
+        for start, end, name, kind in blocks:
+            self.add(start, end, name, kind)
+    
+    @classmethod
+    def from_appointments(cls, appointments):
+        """Build from {'name', 'start', 'end'} dicts with HH:MM times, as kept in the session"""
+        return cls(
+            (time_to_minutes(appointment['start']), time_to_minutes(appointment['end']), appointment['name'], 'appointment')
+            for appointment in appointments
+        )
+    
+    def __len__(self):
+        return len(self._blocks)
+    
+    def __iter__(self):
+        return iter(self._blocks)
+    
+    def add(self, start, end, name, kind='appointment'):
+        """Insert a block; raises ValueError if it is empty or overlaps another"""
+        if end <= start:
+            raise ValueError(f"{name} must end after it starts")
+        clashes = self.conflicts(start, end)
+        if clashes:
+            raise ValueError(f"{name} overlaps {clashes[0][2]} ({minutes_to_time(clashes[0][0])})")
+        index = bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+        self._blocks.insert(index, (start, end, name, kind))
+    
+    def remove(self, start):
+        """Drop the block starting at start"""
+        index = bisect_left(self._starts, start)
+        if index == len(self._starts) or self._starts[index] != start:
+            raise KeyError(start)
+        del self._starts[index], self._ends[index], self._blocks[index]
+    
+    def conflicts(self, start, end):
+        """Blocks overlapping [start, end)"""
+        return self._blocks[bisect_right(self._ends, start):bisect_left(self._starts, end)]
+    
+    def fit(self, start, duration):
+        """Earliest start at or after start where duration minutes clash with no block"""
+        index = bisect_right(self._ends, start)
+        while index < len(self._blocks) and self._starts[index] < start + duration:
+            start = max(start, self._ends[index])
+            index += 1
+        return start
+    
+    def free_gaps(self, start, end):
+        """(gap_start, gap_end) pairs of [start, end) not covered by any block"""
+        gaps = []
+        cursor = start
+        for block_start, block_end, _, _ in self.conflicts(start, end):
+            if block_start > cursor:
+                gaps.append((cursor, block_start))
+            cursor = max(cursor, block_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+    
+    def schedule_items(self, start, end):
+        """Schedule entries for the blocks overlapping [start, end)"""
+        return [
+            {
+                'name': name,
+                'type': kind,
+                'start_time': minutes_to_time(block_start),
+                'end_time': minutes_to_time(block_end),
+                'duration': block_end - block_start,
+                'time_minutes': block_start
+            }
+            for block_start, block_end, name, kind in self.conflicts(start, end)
+        ]
+
+def merge_fixed_items(schedule, calendar, start, end):
+    """Merge a calendar's blocks into a placed schedule by start time"""
+    if calendar is None or not len(calendar):
+        return schedule
+    fixed = calendar.schedule_items(start, end)
+    merged = []
+    index = 0
+    for item in schedule:
+        while index < len(fixed) and fixed[index]['time_minutes'] <= item['time_minutes']:
+            merged.append(fixed[index])
+            index += 1
+        merged.append(item)
+    merged.extend(fixed[index:])
+    return merged
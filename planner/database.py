@@ -0,0 +1,557 @@
+# planner/database.py
+# SQLite persistence: schedules, preferences and daily analytics
+
+import json
+import queue
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from .items import schedule_to_dicts
+from .timeutils import minutes_to_time
+
+# Storage formats for tasks_data/schedule_data
+class JsonSerializer:
+    """Plain JSON text, the original format; still used to read old rows"""
+    format_id = None
+    
+    def dumps(self, data):
+        return json.dumps(data, default=str)  # Handle datetime objects
+    
+    def loads(self, raw):
+        return json.loads(raw)
+
+class CompressedJsonSerializer:
+    """Format byte and summary header followed by zlib-compressed JSON"""
+    format_id = 1
+    # format id, item count, total minutes, first start minute, last end minute
+    HEADER = struct.Struct('<BIIII')
+    
+    def __init__(self, level=6):
+        self.level = level
+    
+    def dumps(self, data):
+        body = json.dumps(data, default=str, separators=(',', ':')).encode('utf-8')
+        return self.HEADER.pack(self.format_id, *payload_summary(data)) + zlib.compress(body, self.level)
+    
+    def loads(self, raw):
+        return json.loads(zlib.decompress(raw[self.HEADER.size:]))
+    
+    def summary(self, header):
+        """Decode just the header; the compressed body is never touched"""
+        _, items, total_minutes, first_start, last_end = self.HEADER.unpack(header[:self.HEADER.size])
+        return items, total_minutes, first_start, last_end
+
+# Binary formats by their leading format byte
+SERIALIZERS = {CompressedJsonSerializer.format_id: CompressedJsonSerializer()}
+
+def payload_summary(items):
+    """(count, total minutes, first start, last end) of a stored list"""
+    starts = [item['time_minutes'] for item in items if 'time_minutes' in item]
+    ends = [item['time_minutes'] + item['duration'] for item in items if 'time_minutes' in item]
+    total_minutes = sum(item.get('duration', 0) for item in items)
+    return len(items), total_minutes, min(starts, default=0), max(ends, default=0)
+
+def decode_payload(raw):
+    """Decode a stored column value in any supported format"""
+    if isinstance(raw, str):
+        return JsonSerializer().loads(raw)
+    return SERIALIZERS[raw[0]].loads(raw)
+
+# Spilled generations kept per session, and the age after which any are dropped at startup
+HISTORY_SPILL_LIMIT = 100
+HISTORY_RETENTION_DAYS = 30
+
+# Database Class
+class PlannerDatabase:
+    def __init__(self, db_path="planner.db", pool_size=8, serializer=None):
+        self.db_path = db_path
+        # Format for new writes; rows in any known format can always be read
+        self.serializer = serializer or CompressedJsonSerializer()
+        # Idle connections, reused across Streamlit script runner threads
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self.init_database()
+    
+    def _connect(self):
+        """Open a connection tuned for many concurrent readers and writers"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Check a pooled connection out for the current thread"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self):
+        """Close all idle pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+    
+    def init_database(self):
+        """Initialize SQLite database and apply pending schema migrations"""
+        compact = False
+        with self.connection() as conn:
+            # Lock out other processes while checking and migrating the schema
+            conn.execute('BEGIN IMMEDIATE')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, migration in enumerate(self.MIGRATIONS[version:], version + 1):
+                removed_rows = migration(self, conn)
+                compact = compact or bool(removed_rows)
+                conn.execute(f'PRAGMA user_version = {target}')
+            
+            # Drop generations of sessions that have long ended
+            cutoff = datetime.now() - timedelta(days=HISTORY_RETENTION_DAYS)
+            conn.execute('DELETE FROM schedule_history WHERE generated_at < ?', (cutoff,))
+            conn.commit()
+            
+            # Give space freed by migrations back to the filesystem
+            if compact:
+                conn.execute('VACUUM')
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def _migrate_create_tables(self, conn):
+        """Migration 1: base tables"""
+        # Create schedules table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT DEFAULT 'default_user',
+                schedule_name TEXT NOT NULL,
+                tasks_data TEXT NOT NULL,
+                schedule_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Create user preferences table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_preferences (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT DEFAULT 'default_user',
+                start_hour INTEGER DEFAULT 7,
+                end_hour INTEGER DEFAULT 22,
+                breakfast_time TEXT DEFAULT '08:00',
+                lunch_time TEXT DEFAULT '12:30',
+                dinner_time TEXT DEFAULT '18:30',
+                default_break INTEGER DEFAULT 10,
+                pomodoro_work INTEGER DEFAULT 25,
+                pomodoro_short_break INTEGER DEFAULT 5,
+                pomodoro_long_break INTEGER DEFAULT 20,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Create analytics table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS analytics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT DEFAULT 'default_user',
+                date DATE NOT NULL,
+                total_tasks INTEGER DEFAULT 0,
+                completed_tasks INTEGER DEFAULT 0,
+                total_work_time INTEGER DEFAULT 0,
+                pomodoro_sessions INTEGER DEFAULT 0,
+                productivity_score REAL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    def _migrate_unique_schedules(self, conn):
+        """Migration 2: dedupe schedules, then enforce one row per name and index listings"""
+        # Keep only the latest save of every schedule name
+        cursor = conn.execute('''
+            DELETE FROM schedules WHERE id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, schedule_name
+                        ORDER BY updated_at DESC, id DESC
+                    ) AS position
+                    FROM schedules
+                ) WHERE position = 1
+            )
+        ''')
+        removed_rows = cursor.rowcount
+        
+        # Load query and save_schedule upsert conflict target
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_schedules_user_name
+            ON schedules (user_id, schedule_name)
+        ''')
+        
+        # Covering index for the sidebar listing query
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_schedules_user_updated
+            ON schedules (user_id, updated_at DESC, schedule_name, created_at)
+        ''')
+        return removed_rows
+    
+    def _migrate_analytics_daily_key(self, conn):
+        """Migration 3: one analytics row per user and day"""
+        cursor = conn.execute('''
+            DELETE FROM analytics WHERE id NOT IN (
+                SELECT MAX(id) FROM analytics GROUP BY user_id, date
+            )
+        ''')
+        removed_rows = cursor.rowcount
+        
+        # Upsert target and range index for the trend queries
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_user_date
+            ON analytics (user_id, date)
+        ''')
+        return removed_rows
+    
+    def _migrate_schedule_history(self, conn):
+        """Migration 4: generation history spilled out of sessions"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schedule_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT DEFAULT 'default_user',
+                session_id TEXT NOT NULL,
+                generated_at TIMESTAMP NOT NULL,
+                tasks_count INTEGER DEFAULT 0,
+                schedule_data BLOB NOT NULL
+            )
+        ''')
+        
+        # Newest-first reads of one session's history
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_schedule_history_session
+            ON schedule_history (user_id, session_id, generated_at DESC)
+        ''')
+    
+    def _migrate_completion_events(self, conn):
+        """Migration 5: one row per schedule item marked complete"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS completion_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT DEFAULT 'default_user',
+                item_id TEXT NOT NULL,
+                task_name TEXT,
+                day DATE NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Completing an item twice on the same day is one event
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_completion_events_user_day_item
+            ON completion_events (user_id, day, item_id)
+        ''')
+    
+    # Schema migrations in order; PRAGMA user_version holds how many have run
+    MIGRATIONS = [
+        _migrate_create_tables, _migrate_unique_schedules, _migrate_analytics_daily_key,
+        _migrate_schedule_history, _migrate_completion_events
+    ]
+    
+    def save_schedule(self, schedule_name, tasks, schedule):
+        """Save a complete schedule to database"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Encode data in the configured storage format
+            tasks_data = self.serializer.dumps(tasks)
+            schedule_data = self.serializer.dumps(schedule_to_dicts(schedule))
+            
+            # Update in place so the row keeps its id and created_at
+            cursor.execute('''
+                INSERT INTO schedules 
+                (user_id, schedule_name, tasks_data, schedule_data, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, schedule_name) DO UPDATE SET
+                    tasks_data = excluded.tasks_data,
+                    schedule_data = excluded.schedule_data,
+                    updated_at = excluded.updated_at
+                RETURNING id
+            ''', ('default_user', schedule_name, tasks_data, schedule_data, datetime.now()))
+            schedule_id = cursor.fetchone()[0]
+            
+            conn.commit()
+        return schedule_id
+    
+    def load_schedule(self, schedule_name):
+        """Load a schedule from database"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT tasks_data, schedule_data FROM schedules 
+                WHERE user_id = ? AND schedule_name = ?
+            ''', ('default_user', schedule_name))
+            
+            result = cursor.fetchone()
+        
+        if result:
+            tasks = decode_payload(result[0])
+            schedule = decode_payload(result[1])
+            return tasks, schedule
+        return None, None
+    
+    def load_schedule_summary(self, schedule_name):
+        """Load schedule metadata without decoding the stored schedule"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Binary rows carry a fixed-size header, so only those bytes are read
+            cursor.execute('''
+                SELECT CASE WHEN typeof(schedule_data) = 'blob'
+                            THEN substr(schedule_data, 1, ?) ELSE schedule_data END,
+                       created_at, updated_at
+                FROM schedules 
+                WHERE user_id = ? AND schedule_name = ?
+            ''', (CompressedJsonSerializer.HEADER.size, 'default_user', schedule_name))
+            
+            result = cursor.fetchone()
+        
+        if not result:
+            return None
+        
+        raw, created_at, updated_at = result
+        if isinstance(raw, str):
+            items, total_minutes, first_start, last_end = payload_summary(json.loads(raw))
+        else:
+            items, total_minutes, first_start, last_end = SERIALIZERS[raw[0]].summary(raw)
+        return {
+            'schedule_name': schedule_name,
+            'items': items,
+            'total_minutes': total_minutes,
+            'start_time': minutes_to_time(first_start),
+            'end_time': minutes_to_time(last_end),
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+    
+    def get_all_schedules(self):
+        """Get list of all saved schedules"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT schedule_name, created_at, updated_at 
+                FROM schedules 
+                WHERE user_id = ?
+                ORDER BY updated_at DESC
+            ''', ('default_user',))
+            
+            schedules = cursor.fetchall()
+        return schedules
+    
+    def list_schedules(self, limit=20, after=None, prefix=''):
+        """Get one page of saved schedules, newest first
+        
+        after is the (updated_at, schedule_name) of the last row on the previous
+        page; prefix keeps only schedule names starting with it.
+        """
+        query = '''
+            SELECT schedule_name, created_at, updated_at 
+            FROM schedules 
+            WHERE user_id = ?
+        '''
+        params = ['default_user']
+        
+        if prefix:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query += " AND schedule_name LIKE ? ESCAPE '\\'"
+            params.append(escaped + '%')
+        
+        # Keyset pagination: continue strictly after the previous page's last row
+        if after is not None:
+            query += ' AND updated_at <= ? AND (updated_at < ? OR schedule_name > ?)'
+            params.extend([after[0], after[0], after[1]])
+        
+        # Same order as idx_schedules_user_updated, so no sort step is needed
+        query += ' ORDER BY updated_at DESC, schedule_name LIMIT ?'
+        params.append(limit)
+        
+        with self.connection() as conn:
+            schedules = conn.execute(query, params).fetchall()
+        return schedules
+    
+    def delete_schedule(self, schedule_name):
+        """Delete a schedule"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                DELETE FROM schedules 
+                WHERE user_id = ? AND schedule_name = ?
+            ''', ('default_user', schedule_name))
+            
+            conn.commit()
+    
+    def save_history_entry(self, session_id, generated_at, tasks_count, schedule):
+        """Store one generation evicted from a session's in-memory history,
+        keeping at most HISTORY_SPILL_LIMIT per session"""
+        schedule_data = self.serializer.dumps(schedule_to_dicts(schedule))
+        with self.connection() as conn:
+            conn.execute('''
+                INSERT INTO schedule_history (user_id, session_id, generated_at, tasks_count, schedule_data)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('default_user', session_id, generated_at, tasks_count, schedule_data))
+            conn.execute('''
+                DELETE FROM schedule_history
+                WHERE user_id = ? AND session_id = ? AND id NOT IN (
+                    SELECT id FROM schedule_history
+                    WHERE user_id = ? AND session_id = ?
+                    ORDER BY generated_at DESC
+                    LIMIT ?
+                )
+            ''', ('default_user', session_id, 'default_user', session_id, HISTORY_SPILL_LIMIT))
+            conn.commit()
+    
+    def load_history(self, session_id, limit=20):
+        """[(generated_at, tasks_count, schedule)] spilled for a session, newest first"""
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT generated_at, tasks_count, schedule_data
+                FROM schedule_history
+                WHERE user_id = ? AND session_id = ?
+                ORDER BY generated_at DESC
+                LIMIT ?
+            ''', ('default_user', session_id, limit)).fetchall()
+        return [(generated_at, tasks_count, decode_payload(raw)) for generated_at, tasks_count, raw in rows]
+    
+    def record_completion(self, item_id, task_name, day=None):
+        """Store that a schedule item was completed"""
+        day = day or date.today()
+        with self.connection() as conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO completion_events (user_id, item_id, task_name, day)
+                VALUES (?, ?, ?, ?)
+            ''', ('default_user', item_id, task_name, day.isoformat()))
+            conn.commit()
+    
+    def load_completions(self, day=None):
+        """Set of item IDs completed on a day"""
+        day = day or date.today()
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT item_id FROM completion_events
+                WHERE user_id = ? AND day = ?
+            ''', ('default_user', day.isoformat())).fetchall()
+        return {row[0] for row in rows}
+    
+    def save_analytics_batch(self, rows):
+        """Write (user_id, date, total_tasks, completed_tasks, total_work_time,
+        pomodoro_sessions, productivity_score) rows, replacing each day's totals"""
+        with self.connection() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO analytics 
+                (user_id, date, total_tasks, completed_tasks, total_work_time, pomodoro_sessions, productivity_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+    
+    def get_daily_analytics(self, days=7, end_date=None):
+        """Get daily totals for the last `days` days, oldest first"""
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT date, total_tasks, completed_tasks, total_work_time, pomodoro_sessions, productivity_score
+                FROM analytics 
+                WHERE user_id = ? AND date BETWEEN ? AND ?
+                ORDER BY date
+            ''', ('default_user', start_date.isoformat(), end_date.isoformat()))
+            
+            rows = cursor.fetchall()
+        return rows
+    
+    def get_analytics_summary(self, days=7, end_date=None):
+        """Get totals and averages over the last `days` days"""
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT COUNT(*), COALESCE(SUM(total_tasks), 0), COALESCE(SUM(completed_tasks), 0),
+                       COALESCE(SUM(total_work_time), 0), COALESCE(SUM(pomodoro_sessions), 0),
+                       COALESCE(AVG(productivity_score), 0)
+                FROM analytics 
+                WHERE user_id = ? AND date BETWEEN ? AND ?
+            ''', ('default_user', start_date.isoformat(), end_date.isoformat()))
+            
+            result = cursor.fetchone()
+        
+        return {
+            'days_tracked': result[0],
+            'total_tasks': result[1],
+            'completed_tasks': result[2],
+            'total_work_time': result[3],
+            'pomodoro_sessions': result[4],
+            'avg_productivity_score': result[5]
+        }
+
+class AnalyticsWriter:
+    """Background thread that batches analytics rows into the database"""
+    
+    def __init__(self, db, batch_size=50, flush_interval=2.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+        self._thread.start()
+    
+    def record(self, day, total_tasks, completed_tasks, total_work_time, pomodoro_sessions,
+               productivity_score, user_id='default_user'):
+        """Queue one day's totals; returns immediately"""
+        self._queue.put((user_id, day.isoformat(), total_tasks, completed_tasks,
+                         total_work_time, pomodoro_sessions, productivity_score))
+    
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        self._queue.join()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                # Only the latest totals per user and day need writing
+                latest = {(row[0], row[1]): row for row in batch}
+                self.db.save_analytics_batch(list(latest.values()))
+            except Exception as e:
+                self.last_error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
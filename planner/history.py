@@ -0,0 +1,100 @@
+# planner/history.py
+# Bounded generation history stored as deltas between consecutive schedules
+
+from collections import deque
+from datetime import datetime
+
+from .items import ScheduleItem
+
+# Generations kept in memory per session before the oldest is evicted
+HISTORY_CAPACITY = 20
+
+# Derived from time_minutes and duration, so not stored
+_DERIVED_KEYS = ('start_time', 'end_time')
+
+def _freeze(item):
+    """Hashable (key, value) form of a schedule item, without derived fields"""
+    return tuple((key, item[key]) for key in item.keys() if key not in _DERIVED_KEYS)
+
+def _diff(previous, current):
+    """(prefix, suffix, middle): current is previous with the items between a shared
+    prefix and suffix replaced by middle"""
+    limit = min(len(previous), len(current))
+    prefix = 0
+    while prefix < limit and previous[prefix] == current[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and previous[-1 - suffix] == current[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix, tuple(current[prefix:len(current) - suffix])
+
+def _apply(previous, delta):
+    prefix, suffix, middle = delta
+    return previous[:prefix] + middle + previous[len(previous) - suffix:]
+
+class ScheduleHistory:
+    """Ring buffer of generated schedules for one session
+    
+    Only the newest schedule and the one just before the oldest kept entry
+    are held in full; every entry is the delta against the one before it,
+    so regenerations that only move a few items cost a few items. Entries
+    past capacity are evicted oldest first and, if a database is given,
+    written to its schedule_history table. total counts every generation
+    ever recorded, evicted or not.
+    """
+    
+    def __init__(self, capacity=HISTORY_CAPACITY, db=None, session_id=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.db = db
+        self.session_id = session_id
+        self.total = 0
+        # (timestamp, tasks_count, delta); the first delta is against an empty schedule
+        self._entries = deque()
+        self._base = ()
+        self._latest = ()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def append(self, schedule, tasks_count, timestamp=None):
+        """Record a generated schedule"""
+        current = tuple(_freeze(item) for item in schedule)
+        self._entries.append((timestamp or datetime.now(), tasks_count, _diff(self._latest, current)))
+        self._latest = current
+        self.total += 1
+        
+        if len(self._entries) > self.capacity:
+            timestamp, tasks_count, delta = self._entries.popleft()
+            evicted = _apply(self._base, delta)
+            if self.db is not None:
+                self.db.save_history_entry(self.session_id, timestamp, tasks_count, self._thaw(evicted))
+            self._base = evicted
+    
+    def entries(self):
+        """[{'timestamp', 'tasks_count'}] of the kept generations, oldest first"""
+        return [{'timestamp': timestamp, 'tasks_count': tasks_count} for timestamp, tasks_count, _ in self._entries]
+    
+    def schedule(self, index=-1):
+        """Rebuild the schedule of a kept generation as ScheduleItems"""
+        if index < 0:
+            index += len(self._entries)
+        if not 0 <= index < len(self._entries):
+            raise IndexError("history index out of range")
+        if index == len(self._entries) - 1:
+            return self._thaw(self._latest)
+        items = self._base
+        for position in range(index + 1):
+            items = _apply(items, self._entries[position][2])
+        return self._thaw(items)
+    
+    def spilled(self, limit=20):
+        """Generations evicted to the database, newest first"""
+        if self.db is None:
+            return []
+        return self.db.load_history(self.session_id, limit)
+    
+    @staticmethod
+    def _thaw(items):
+        return [ScheduleItem.from_dict(dict(item)) for item in items]
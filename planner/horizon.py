@@ -0,0 +1,133 @@
+# planner/horizon.py
+# Multi-day planning: spreads tasks over the days up to their deadlines
+
+from datetime import date, timedelta
+
+from .metrics import PhaseTimer
+from .packing import free_intervals, layout_intervals, simulate_interval, task_profile
+from .scheduling import analyze_schedule_task
+
+# Longest horizon the planner accepts
+MAX_HORIZON_DAYS = 30
+
+class DayCalendar:
+    """Fixed blocks and free intervals of one day, and the tasks appended to each interval
+    
+    Tasks are only ever appended, so a placement re-simulates the interval it
+    lands in plus any later ones that inherit its work timer.
+    """
+    
+    def __init__(self, day, blocks, intervals, settings):
+        self.day = day
+        self.blocks = blocks
+        self.intervals = intervals
+        self.long_break_after = settings['long_break_after'] * 60
+        self.long_break_duration = settings['long_break_duration']
+        self.tasks = [[] for _ in intervals]
+        self.profiles = [[] for _ in intervals]
+        self.states = self._simulate_from(0)
+        self.free_minutes = self._free_minutes()
+    
+    def add(self, task, profile):
+        """First-fit the task into the earliest interval it fits; False if none does"""
+        for position in range(len(self.intervals)):
+            start, end, _ = self.intervals[position]
+            if end - self.states[position][0] < profile[1]:
+                continue
+            self.profiles[position].append(profile)
+            states = self._simulate_from(position)
+            if states is None:
+                self.profiles[position].pop()
+                continue
+            self.tasks[position].append(task)
+            self.states = states
+            self.free_minutes = self._free_minutes()
+            return True
+        return False
+    
+    def _simulate_from(self, first):
+        states = list(self.states[:first]) if first else []
+        for position in range(first, len(self.intervals)):
+            start, end, resets_work = self.intervals[position]
+            work = 0 if resets_work or not states else states[-1][1]
+            state = simulate_interval(
+                self.profiles[position], start, end, work, self.long_break_after, self.long_break_duration)
+            if state is None:
+                return None
+            states.append(state)
+        return states
+    
+    def _free_minutes(self):
+        return sum(max(end - state[0], 0) for (_, end, _), state in zip(self.intervals, self.states))
+
+def plan_horizon(tasks, days, start_hour, end_hour, meal_times, settings, start_date=None, timings=None,
+                 calendar=None):
+    """Plan up to MAX_HORIZON_DAYS days, spreading each task over the days before its deadline
+    
+    Tasks are taken earliest deadline first (then by priority) and go to the
+    emptiest day they fit on by their deadline; a task with no deadline may
+    use the whole horizon. A task that fits nowhere in time overflows to the
+    first later day with room and is listed under 'late'; one that fits
+    nowhere at all is listed under 'unscheduled'. calendar holds the first
+    day's appointments.
+    
+    Returns {'days': [{'date', 'schedule'}], 'late': [...], 'unscheduled': [...]}.
+    """
+    days = max(1, min(days, MAX_HORIZON_DAYS))
+    start_date = start_date or date.today()
+    
+    phases = PhaseTimer(timings)
+    analyzed_tasks = [analyze_schedule_task(task) for task in tasks]
+    profiles = [task_profile(task, settings) for task in analyzed_tasks]
+    
+    phases.lap('analysis')
+    
+    first_day = free_intervals(start_hour, end_hour, meal_times, calendar)
+    other_days = free_intervals(start_hour, end_hour, meal_times)
+    day_plans = [
+        DayCalendar(start_date + timedelta(days=offset), *(other_days if offset else first_day), settings)
+        for offset in range(days)
+    ]
+    
+    def due_day(index):
+        deadline = analyzed_tasks[index]['deadline_days']
+        return days - 1 if deadline is None else min(deadline, days - 1)
+    
+    order = sorted(
+        range(len(analyzed_tasks)),
+        key=lambda i: (due_day(i), -analyzed_tasks[i]['priority'], analyzed_tasks[i]['energy_level'] != 'high', i)
+    )
+    
+    late = []
+    unscheduled = []
+    for index in order:
+        task, profile = analyzed_tasks[index], profiles[index]
+        due = due_day(index)
+        footprint = profile[1] + profile[5]
+        
+        # Emptiest day first spreads the load; ties go to the earlier day
+        on_time = sorted(day_plans[:due + 1], key=lambda day_plan: -day_plan.free_minutes)
+        if any(day_plan.free_minutes >= footprint and day_plan.add(task, profile) for day_plan in on_time):
+            continue
+        
+        overflow = next(
+            (day_plan for day_plan in day_plans[due + 1:]
+             if day_plan.free_minutes >= footprint and day_plan.add(task, profile)),
+            None
+        )
+        if overflow is not None:
+            late.append({'name': task['name'], 'deadline_days': task['deadline_days'], 'date': overflow.day})
+        else:
+            unscheduled.append({'name': task['name'], 'deadline_days': task['deadline_days']})
+    
+    phases.lap('planning')
+    
+    plan_days = [
+        {'date': day.day,
+         'schedule': layout_intervals(day.blocks, day.intervals, day.tasks, day.states, settings)}
+        for day in day_plans
+    ]
+    
+    phases.lap('placement')
+    
+    return {'days': plan_days, 'late': late, 'unscheduled': unscheduled}
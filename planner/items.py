@@ -0,0 +1,176 @@
+# planner/items.py
+# Compact in-memory schedule representations
+
+import hashlib
+from array import array
+
+from .timeutils import minutes_to_time, time_to_minutes
+
+# Sentinel for optional ScheduleItem fields that were never set
+_UNSET = object()
+
+class ScheduleItem:
+    """Compact schedule entry with dict-style read access for the UI"""
+    __slots__ = ('name', 'type', 'original_type', 'priority', 'intensity',
+                 'duration', 'deadline_days', 'time_minutes')
+    
+    # Key order of the dicts produced by create_schedule
+    FIELDS = ('name', 'type', 'original_type', 'priority', 'intensity',
+              'start_time', 'end_time', 'duration', 'deadline_days', 'time_minutes')
+    
+    def __init__(self, name, type, time_minutes, duration, original_type=_UNSET,
+                 priority=_UNSET, intensity=_UNSET, deadline_days=_UNSET):
+        self.name = name
+        self.type = type
+        self.time_minutes = time_minutes
+        self.duration = duration
+        self.original_type = original_type
+        self.priority = priority
+        self.intensity = intensity
+        self.deadline_days = deadline_days
+    
+    @classmethod
+    def from_dict(cls, item):
+        """Build from a create_schedule or database dict"""
+        time_minutes = item.get('time_minutes')
+        if time_minutes is None:
+            time_minutes = time_to_minutes(item['start_time'])
+        return cls(
+            item['name'], item['type'], time_minutes, item['duration'],
+            original_type=item.get('original_type', _UNSET),
+            priority=item.get('priority', _UNSET),
+            intensity=item.get('intensity', _UNSET),
+            deadline_days=item.get('deadline_days', _UNSET)
+        )
+    
+    @property
+    def start_time(self):
+        return minutes_to_time(self.time_minutes)
+    
+    @property
+    def end_time(self):
+        return minutes_to_time(self.time_minutes + self.duration)
+    
+    def keys(self):
+        return [key for key in self.FIELDS if getattr(self, key) is not _UNSET]
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not _UNSET
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self):
+        """Plain dict in the same shape create_schedule returns"""
+        return {key: self[key] for key in self.keys()}
+    
+    def __eq__(self, other):
+        if isinstance(other, ScheduleItem):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    def __repr__(self):
+        return f"ScheduleItem({self.to_dict()!r})"
+
+def item_id(item):
+    """Stable ID of a schedule item, the same in every process
+    
+    Built from the name, type and slot, so a regenerated schedule gives an
+    item the same ID as long as it keeps its start and duration.
+    """
+    time_minutes = item.get('time_minutes')
+    if time_minutes is None:
+        time_minutes = time_to_minutes(item['start_time'])
+    key = f"{item['name']}\x1f{item['type']}\x1f{time_minutes}\x1f{item['duration']}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+def compact_schedule(schedule):
+    """Convert schedule dicts to ScheduleItems for long-lived session storage"""
+    compact = []
+    # Break and session names repeat a lot; keep one copy of each string
+    strings = {}
+    for item in schedule:
+        if not isinstance(item, ScheduleItem):
+            item = ScheduleItem.from_dict(item)
+            item.name = strings.setdefault(item.name, item.name)
+        compact.append(item)
+    return compact
+
+def schedule_to_dicts(schedule):
+    """Convert a schedule of ScheduleItems and/or dicts back to plain dicts"""
+    return [item.to_dict() if isinstance(item, ScheduleItem) else item for item in schedule]
+
+class ScheduleArray:
+    """Columnar schedule backed by the array module, for analytics and export"""
+    
+    def __init__(self):
+        self.name = []
+        self.type_codes = array('B')
+        self.intensity_codes = array('B')
+        self.time_minutes = array('i')
+        self.duration = array('i')
+        self.priority = array('i')
+        self.deadline_days = array('i')
+        self.types = []
+        self.intensities = []
+        self._strings = {}
+    
+    @classmethod
+    def from_schedule(cls, schedule):
+        columns = cls()
+        for item in schedule:
+            columns.append(item)
+        return columns
+    
+    def append(self, item):
+        """Add one schedule item (dict or ScheduleItem); missing numbers are stored as -1"""
+        self.name.append(self._strings.setdefault(item['name'], item['name']))
+        self.type_codes.append(self._code(self.types, item['type']))
+        self.intensity_codes.append(self._code(self.intensities, item.get('intensity')))
+        time_minutes = item.get('time_minutes')
+        self.time_minutes.append(time_minutes if time_minutes is not None else time_to_minutes(item['start_time']))
+        self.duration.append(item['duration'])
+        priority = item.get('priority')
+        self.priority.append(priority if priority is not None else -1)
+        deadline_days = item.get('deadline_days')
+        self.deadline_days.append(deadline_days if deadline_days is not None else -1)
+    
+    def __len__(self):
+        return len(self.name)
+    
+    def column(self, name):
+        """Decoded values of a single column"""
+        if name == 'type':
+            return [self.types[code] for code in self.type_codes]
+        if name == 'intensity':
+            return [self.intensities[code] for code in self.intensity_codes]
+        return list(getattr(self, name))
+    
+    def total_duration_by_type(self):
+        """Sum of minutes per activity type in one pass"""
+        totals = [0] * len(self.types)
+        for code, duration in zip(self.type_codes, self.duration):
+            totals[code] += duration
+        return dict(zip(self.types, totals))
+    
+    @staticmethod
+    def _code(table, value):
+        try:
+            return table.index(value)
+        except ValueError:
+            table.append(value)
+            return len(table) - 1
@@ -0,0 +1,79 @@
+# planner/lru.py
+# Thread-safe LRU cache shared by the analysis, timeline and figure caches
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Least recently used entries evicted once their total weight passes maxsize
+    
+    Every entry weighs 1 unless weigh is given, so by default maxsize is an
+    entry count. Values are built outside the lock, and the newest entry is
+    always kept even if it alone weighs more than maxsize.
+    """
+    
+    def __init__(self, maxsize, weigh=None):
+        self.maxsize = maxsize
+        self.weigh = weigh
+        self.hits = 0
+        self.misses = 0
+        self.weight = 0
+        # key -> (value, weight)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_or_build(self, key, build, *args):
+        """Cached value for key; on a miss build(*args) is called and its result stored"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        
+        value = build(*args)
+        weight = self.weigh(value) if self.weigh else 1
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.weight -= previous[1]
+            self._entries[key] = (value, weight)
+            self.weight += weight
+            self._evict()
+        return value
+    
+    def resize(self, maxsize):
+        """Change the bound, evicting least recently used entries"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Hit/miss counters, entry count and total weight"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'size': self.weight,
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def _evict(self):
+        while self.weight > self.maxsize and len(self._entries) > 1:
+            _, (_, weight) = self._entries.popitem(last=False)
+            self.weight -= weight
@@ -0,0 +1,41 @@
+# planner/metrics.py
+# Process-wide scheduling timings
+
+import threading
+import time
+
+class PhaseTimer:
+    """Stores the seconds since the previous phase ended in timings; does nothing if timings is None"""
+    
+    def __init__(self, timings):
+        self.timings = timings
+        self.started = time.perf_counter()
+    
+    def lap(self, phase):
+        if self.timings is not None:
+            now = time.perf_counter()
+            self.timings[phase] = now - self.started
+            self.started = now
+
+class GenerationMetrics:
+    """Process-wide count, total and worst-case seconds per scheduling phase"""
+    
+    def __init__(self):
+        self._phases = {}
+        self._lock = threading.Lock()
+    
+    def record(self, timings):
+        with self._lock:
+            for phase, seconds in timings.items():
+                count, total, worst = self._phases.get(phase, (0, 0.0, 0.0))
+                self._phases[phase] = (count + 1, total + seconds, max(worst, seconds))
+    
+    def snapshot(self):
+        """{phase: {'count', 'avg_ms', 'max_ms'}}"""
+        with self._lock:
+            return {
+                phase: {'count': count, 'avg_ms': total / count * 1000, 'max_ms': worst * 1000}
+                for phase, (count, total, worst) in self._phases.items()
+            }
+
+generation_metrics = GenerationMetrics()
@@ -0,0 +1,316 @@
+# planner/packing.py
+# Slot packing: fits tasks into the free intervals between fixed meals
+
+import time
+
+from .calendar import Calendar
+from .metrics import PhaseTimer
+from .scheduling import (
+    analyze_schedule_task, format_schedule_times, greedy_schedule, meal_windows, place_tasks,
+    pomodoro_template, priority_order_key
+)
+
+# Solver time budget in seconds before settling for the best packing found
+PACKING_TIME_BUDGET = 0.25
+
+class _BudgetExhausted(Exception):
+    pass
+
+def task_profile(task, settings):
+    """Reduce an analyzed task to what packing needs: how it moves time and the work timer
+    
+    Returns (duration, span, work, work_resets_to, trailing_break, brain_rest) with the
+    same rules as place_tasks: pomodoro long breaks and brain rest reset the work timer,
+    and the regular break is dropped after the last task of an interval.
+    """
+    duration = task['duration']
+    trailing_break = 0
+    work_resets_to = None
+    
+    if task['use_pomodoro'] and duration > settings['pomodoro_work_time']:
+        _, span, work_resets_to = pomodoro_template(
+            duration,
+            settings['pomodoro_work_time'],
+            settings['pomodoro_short_break'],
+            settings['pomodoro_long_break']
+        )
+    else:
+        span = duration
+        if task['needs_break_after']:
+            trailing_break = task['break_duration']
+    
+    brain_rest = 0
+    if task['needs_brain_rest'] and task['mental_load'] in ['high', 'very_high']:
+        brain_rest = settings['brain_rest_duration']
+    
+    return duration, span, duration, work_resets_to, trailing_break, brain_rest
+
+def simulate_interval(profiles, start, end, work, long_break_after, long_break_duration):
+    """End time and work timer after placing profiles in order from start, or None if they overflow"""
+    current_time = start
+    last = len(profiles) - 1
+    for index, (duration, span, task_work, work_resets_to, trailing_break, brain_rest) in enumerate(profiles):
+        if work >= long_break_after:
+            current_time += long_break_duration
+            work = 0
+        if current_time + duration > end:
+            return None
+        current_time += span
+        work = work + task_work if work_resets_to is None else work_resets_to
+        if index < last:
+            current_time += trailing_break
+        if brain_rest:
+            current_time += brain_rest
+            work = 0
+    if current_time > end:
+        return None
+    return current_time, work
+
+def free_intervals(start_hour, end_hour, meal_times, calendar=None):
+    """Split the day around meals pinned at their set times and any calendar appointments
+    
+    Returns (blocks, intervals): blocks as (start, name, duration, resets_work, type) and
+    one (start, end, resets_work) interval before each block and one after the last.
+    A meal that clashes with an earlier meal or an appointment is dropped.
+    """
+    day_start = start_hour * 60
+    day_end = end_hour * 60
+    day = Calendar(calendar or ())
+    resets = {}
+    for _, _, meal_time, name, duration, resets_work in meal_windows(meal_times):
+        if day_start <= meal_time < day_end and not day.conflicts(meal_time, meal_time + duration):
+            day.add(meal_time, meal_time + duration, name, 'meal')
+            resets[meal_time] = resets_work
+    
+    blocks = []
+    intervals = []
+    interval_start, resets_work = day_start, True
+    for block_start, block_end, name, kind in day.conflicts(day_start, day_end):
+        blocks.append((block_start, name, block_end - block_start, resets.get(block_start, False), kind))
+        intervals.append((interval_start, max(interval_start, block_start), resets_work))
+        interval_start, resets_work = max(interval_start, block_end), blocks[-1][3]
+    intervals.append((interval_start, max(interval_start, day_end), resets_work))
+    return blocks, intervals
+
+def layout_intervals(blocks, intervals, interval_tasks, states, settings):
+    """Build the schedule for packed intervals: each fixed block, then its interval laid out by place_tasks
+    
+    interval_tasks holds the analyzed tasks of each interval and states the
+    simulated (end time, work timer) per interval; nothing can overflow here.
+    """
+    schedule = []
+    for position, (start, end, resets_work) in enumerate(intervals):
+        if position:
+            block_start, name, duration, _, kind = blocks[position - 1]
+            schedule.append({
+                'name': name,
+                'type': kind,
+                'start_time': None,
+                'end_time': None,
+                'duration': duration,
+                'time_minutes': block_start
+            })
+        work = 0 if resets_work or not position else states[position - 1][1]
+        place_tasks(interval_tasks[position], end, settings, schedule, (start, work, []))
+    format_schedule_times(schedule)
+    return schedule
+
+class SlotPacker:
+    """Branch-and-bound assignment of tasks to free intervals
+    
+    Maximizes the sum of priority x duration over the tasks that are placed,
+    among the packings that keep tasks in priority order inside each interval:
+    every node only appends to one interval, so a packing that would need a
+    lower-priority task ahead of a higher one is never considered. Within that
+    restriction the result is optimal only if the search finishes; it starts
+    from first-fit and stops at the time budget with the best packing found
+    so far.
+    """
+    
+    def __init__(self, analyzed_tasks, intervals, settings, time_budget=PACKING_TIME_BUDGET):
+        self.tasks = analyzed_tasks
+        self.intervals = intervals
+        self.long_break_after = settings['long_break_after'] * 60
+        self.long_break_duration = settings['long_break_duration']
+        self.time_budget = time_budget
+        self.profiles = [task_profile(task, settings) for task in analyzed_tasks]
+        self.values = [task['priority'] * task['duration'] for task in analyzed_tasks]
+        # Smallest footprint a task can take (no trailing break) drives the bound
+        footprints = [profile[1] + profile[5] for profile in self.profiles]
+        self.by_density = sorted(
+            range(len(analyzed_tasks)), key=lambda i: self.values[i] / max(footprints[i], 1), reverse=True)
+        self.footprints = footprints
+        self.nodes = 0
+        self.optimal = False
+    
+    def solve(self):
+        """Return one task index list per interval; states then holds its (end time, work timer)"""
+        started = time.perf_counter()
+        self.deadline = started + self.time_budget
+        
+        self.assignment = [[] for _ in self.intervals]
+        self.states = self._simulate_from(0)
+        self.best_value, self.best = self._first_fit()
+        
+        try:
+            self._search()
+            self.optimal = True
+        except _BudgetExhausted:
+            pass
+        self.solve_seconds = time.perf_counter() - started
+        
+        self.assignment = self.best
+        self.states = self._simulate_from(0)
+        return self.best
+    
+    def stats(self):
+        return {
+            'value': self.best_value,
+            'optimal': self.optimal,
+            'nodes': self.nodes,
+            'solve_seconds': self.solve_seconds
+        }
+    
+    def _simulate_from(self, first, states=None):
+        """Per-interval (end time, work timer) from interval first on, or None if anything overflows"""
+        states = list(states[:first]) if states else []
+        for position in range(first, len(self.intervals)):
+            start, end, resets_work = self.intervals[position]
+            work = 0 if resets_work or not states else states[-1][1]
+            state = simulate_interval(
+                [self.profiles[i] for i in self.assignment[position]],
+                start, end, work, self.long_break_after, self.long_break_duration)
+            if state is None:
+                return None
+            states.append(state)
+        return states
+    
+    def _try_append(self, task_index, position):
+        self.assignment[position].append(task_index)
+        states = self._simulate_from(position, self.states)
+        if states is None:
+            self.assignment[position].pop()
+        return states
+    
+    def _first_fit(self):
+        value = 0
+        for task_index in range(len(self.tasks)):
+            for position in range(len(self.intervals)):
+                states = self._try_append(task_index, position)
+                if states is not None:
+                    self.states = states
+                    value += self.values[task_index]
+                    break
+        best = [list(tasks) for tasks in self.assignment]
+        self.assignment = [[] for _ in self.intervals]
+        self.states = self._simulate_from(0)
+        return value, best
+    
+    def _bound(self, task_index, value):
+        """Fractional knapsack over the remaining tasks and the free minutes left"""
+        capacity = sum(max(end - state[0], 0) for (_, end, _), state in zip(self.intervals, self.states))
+        for i in self.by_density:
+            if i < task_index:
+                continue
+            if capacity <= 0:
+                break
+            footprint = self.footprints[i]
+            if footprint <= capacity:
+                value += self.values[i]
+                capacity -= footprint
+            else:
+                value += self.values[i] * capacity / footprint
+                break
+        return value
+    
+    def _visit(self, task_index, value):
+        """Count a node and record it if best; True if its subtree can still beat the best"""
+        self.nodes += 1
+        if self.nodes % 256 == 0 and time.perf_counter() > self.deadline:
+            raise _BudgetExhausted
+        
+        if value > self.best_value:
+            self.best_value = value
+            self.best = [list(tasks) for tasks in self.assignment]
+        return task_index < len(self.tasks) and self._bound(task_index, value) > self.best_value
+    
+    def _search(self):
+        """Depth-first over an explicit stack, so the depth is not limited by the task count
+        
+        Each frame is [task_index, value, next_branch, saved_states, appended_to]:
+        branches 0..len(intervals)-1 append the task to that interval, the last skips it.
+        """
+        skip = len(self.intervals)
+        stack = [[0, 0, 0, self.states, None]] if self._visit(0, 0) else []
+        while stack:
+            frame = stack[-1]
+            task_index, value, branch, saved_states, appended_to = frame
+            if appended_to is not None:
+                self.assignment[appended_to].pop()
+                self.states = saved_states
+                frame[4] = None
+            
+            if branch > skip:
+                stack.pop()
+                continue
+            frame[2] = branch + 1
+            
+            if branch < skip:
+                states = self._try_append(task_index, branch)
+                if states is None:
+                    continue
+                self.states = states
+                frame[4] = branch
+                value += self.values[task_index]
+            if self._visit(task_index + 1, value):
+                stack.append([task_index + 1, value, 0, self.states, None])
+
+def schedule_value(schedule):
+    """Sum of priority x duration over the task items of a schedule"""
+    return sum(item['priority'] * item['duration'] for item in schedule if 'priority' in item)
+
+def create_packed_schedule(tasks, start_hour, end_hour, meal_times, settings,
+                           time_budget=PACKING_TIME_BUDGET, timings=None, stats=None, calendar=None):
+    """Schedule by packing tasks into the gaps between meals instead of stopping at the first misfit
+    
+    Meals are pinned at their set times, around any calendar appointments.
+    The packing is compared with the greedy create_schedule result and the
+    greedy schedule is returned if it is worth more, so this never does worse
+    than the greedy engine. Pass dicts as timings and stats to get the phase
+    times and the solver outcome (value, greedy_value, engine, optimal, nodes,
+    solve_seconds).
+    """
+    if not tasks:
+        return []
+    
+    phases = PhaseTimer(timings)
+    analyzed_tasks = [analyze_schedule_task(task) for task in tasks]
+    
+    phases.lap('analysis')
+    
+    analyzed_tasks.sort(key=priority_order_key, reverse=True)
+    
+    phases.lap('sort')
+    
+    blocks, intervals = free_intervals(start_hour, end_hour, meal_times, calendar)
+    packer = SlotPacker(analyzed_tasks, intervals, settings, time_budget)
+    assignment = packer.solve()
+    if stats is not None:
+        stats.update(packer.stats())
+    
+    phases.lap('solve')
+    
+    schedule = layout_intervals(
+        blocks, intervals, [[analyzed_tasks[i] for i in tasks] for tasks in assignment], packer.states, settings)
+    
+    # The greedy engine may run tasks through a meal slot and beat every packing
+    greedy = greedy_schedule(analyzed_tasks, start_hour, end_hour, meal_times, settings, calendar)
+    value, greedy_value = schedule_value(schedule), schedule_value(greedy)
+    if greedy_value > value:
+        schedule, value = greedy, greedy_value
+    if stats is not None:
+        stats.update(value=value, greedy_value=greedy_value, engine='greedy' if schedule is greedy else 'packed')
+    
+    phases.lap('placement')
+    
+    return schedule
@@ -0,0 +1,139 @@
+# planner/profiling.py
+# Opt-in profiling of scheduling phases and helpers
+
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from . import analysis, packing, scheduling, timeutils
+
+logger = logging.getLogger(__name__)
+
+# Helpers timed while profiling, as (owning module, name). Times are inclusive,
+# so analyze_schedule_task also covers the analysis and priority calls it makes.
+PROFILED_HELPERS = [
+    (analysis, 'analyze_task_comprehensive'),
+    (analysis, 'calculate_priority'),
+    (scheduling, 'analyze_schedule_task'),
+    (scheduling, 'meal_windows'),
+    (scheduling, 'place_tasks'),
+    (scheduling, 'pomodoro_template'),
+    (scheduling, 'format_schedule_times'),
+    (timeutils, 'minutes_to_time'),
+    (packing, 'task_profile'),
+    (packing, 'simulate_interval')
+]
+
+# Profiler of the current thread or task; wrapped helpers record nothing without one
+_active_profiler = ContextVar('active_profiler', default=None)
+
+# The wrappers are installed by the first active profile() and removed by the last
+_install_lock = threading.Lock()
+_install_count = 0
+_patched = []
+
+class Profiler:
+    """Wall time and call counts per phase and per helper"""
+    
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def add(self, name, seconds, calls=1):
+        with self._lock:
+            count, total = self._stats.get(name, (0, 0.0))
+            self._stats[name] = (count + calls, total + seconds)
+    
+    def add_phases(self, timings):
+        """Fold in a timings dict filled by create_schedule and the other engines"""
+        for phase, seconds in timings.items():
+            self.add(f"phase:{phase}", seconds)
+    
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(f"phase:{name}", time.perf_counter() - started)
+    
+    def report(self):
+        """[{'name', 'calls', 'total_ms', 'per_call_us'}], slowest first"""
+        with self._lock:
+            stats = list(self._stats.items())
+        return sorted(
+            (
+                {'name': name, 'calls': calls, 'total_ms': round(total * 1000, 3),
+                 'per_call_us': round(total / calls * 1e6, 3)}
+                for name, (calls, total) in stats
+            ),
+            key=lambda entry: entry['total_ms'],
+            reverse=True
+        )
+    
+    def log(self, level=logging.INFO):
+        """One JSON log line per phase and helper"""
+        for entry in self.report():
+            logger.log(level, json.dumps({'event': 'profile', **entry}))
+
+def _wrap(name, func):
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        profiler = _active_profiler.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.add(name, time.perf_counter() - started)
+    return timed
+
+def _install():
+    global _install_count
+    with _install_lock:
+        _install_count += 1
+        if _install_count > 1:
+            return
+        modules = [module for name, module in list(sys.modules.items())
+                   if module is not None and (name == 'planner' or name.startswith('planner.'))]
+        for owner, name in PROFILED_HELPERS:
+            original = getattr(owner, name)
+            timed = _wrap(name, original)
+            for module in modules:
+                if getattr(module, name, None) is original:
+                    setattr(module, name, timed)
+                    _patched.append((module, name, original))
+
+def _uninstall():
+    global _install_count
+    with _install_lock:
+        _install_count -= 1
+        if _install_count:
+            return
+        for module, name, original in _patched:
+            setattr(module, name, original)
+        _patched.clear()
+
+@contextmanager
+def profile():
+    """Time the profiled helpers called from this thread for the duration of the block
+    
+    The helpers are swapped for timed wrappers in every planner module that
+    imported them while any profile() block is open, and restored when the
+    last one exits. Each wrapper records into the profiler of the calling
+    context only, so concurrent sessions are neither recorded nor blocked.
+    """
+    profiler = Profiler()
+    _install()
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+        _uninstall()
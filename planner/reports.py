@@ -0,0 +1,80 @@
+# planner/reports.py
+# Row views of a schedule for the CSV exports and the analytics tab, and the
+# cache of serialized analytics figures
+
+from .lru import LRUCache
+
+# Serialized figures kept across sessions, bounded by total JSON length
+FIGURE_CACHE_CHARS = 16 * 1024 * 1024
+
+def analytics_rows(schedule):
+    """One row per item with the fields the analytics charts group on"""
+    rows = []
+    for item in schedule:
+        rows.append({
+            'name': item['name'],
+            'type': item.get('type', 'unknown'),
+            'duration': item['duration'],
+            'intensity': item.get('intensity', 'Light'),
+            'start_hour': int(item['start_time'].split(':')[0]) if 'start_time' in item else 9
+        })
+    return rows
+
+def export_rows(schedule):
+    """One row per item as shown in the schedule CSV"""
+    rows = []
+    for item in schedule:
+        rows.append({
+            'Time': f"{item.get('start_time', 'N/A')} - {item.get('end_time', 'N/A')}",
+            'Activity': item['name'],
+            'Type': item.get('type', 'unknown'),
+            'Duration (min)': item['duration'],
+            'Intensity': item.get('intensity', 'N/A'),
+            'Priority': item.get('priority', 'N/A')
+        })
+    return rows
+
+def analytics_aggregates(schedule):
+    """Everything the analytics charts plot, gathered in one pass over the schedule
+    
+    Returns minutes per type sorted by type (as groupby would), intensity
+    counts most common first (as value_counts would) and the start hour,
+    duration and type columns of the activity timeline.
+    """
+    minutes_by_type = {}
+    intensity_counts = {}
+    start_hours = []
+    durations = []
+    types = []
+    for item in schedule:
+        item_type = item.get('type', 'unknown')
+        intensity = item.get('intensity', 'Light')
+        duration = item['duration']
+        minutes_by_type[item_type] = minutes_by_type.get(item_type, 0) + duration
+        intensity_counts[intensity] = intensity_counts.get(intensity, 0) + 1
+        start_hours.append(int(item['start_time'].split(':')[0]) if 'start_time' in item else 9)
+        durations.append(duration)
+        types.append(item_type)
+    
+    return {
+        'minutes_by_type': dict(sorted(minutes_by_type.items())),
+        'intensity_counts': dict(sorted(intensity_counts.items(), key=lambda entry: -entry[1])),
+        'timeline': {'start_hour': start_hours, 'duration': durations, 'type': types}
+    }
+
+class FigureCache(LRUCache):
+    """Thread-safe LRU of serialized figure JSON, bounded by total size
+    
+    Keys should include a content hash of whatever the figure was built
+    from, so an unchanged schedule reuses its figures across reruns and
+    sessions.
+    """
+    
+    def __init__(self, max_chars=FIGURE_CACHE_CHARS):
+        super().__init__(max_chars, weigh=len)
+    
+    def get(self, key, build):
+        """Cached JSON for key; on a miss build() is called and its JSON string stored"""
+        return self.get_or_build(key, build)
+
+figure_cache = FigureCache()
@@ -0,0 +1,507 @@
+# planner/scheduling.py
+# Scheduling engine: pomodoro expansion, meal placement and bulk generation
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .analysis import analyze_task_comprehensive, calculate_priority, normalize_task_name
+from .calendar import merge_fixed_items
+from .metrics import PhaseTimer
+from .timeutils import minutes_to_time, time_to_minutes
+
+# Distinct (duration, work, short break, long break) layouts kept by pomodoro_template
+POMODORO_TEMPLATE_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=POMODORO_TEMPLATE_CACHE_SIZE)
+def pomodoro_template(task_duration, work_time, short_break, long_break):
+    """Session layout of a pomodoro task, computed in closed form and shared per parameters
+    
+    Returns (sessions, span, work_resets_to): sessions is a tuple of
+    (offset, type, duration, session, break_name) with offsets from the task
+    start, span is the minutes from the first session start to the last
+    session end, and work_resets_to is the work timer after the task if it
+    contains a long break, else None. The result is cached, so callers must
+    not change it; place items by adding their own start to each offset.
+    """
+    if task_duration <= 0:
+        return (), 0, None
+    full_sessions, remainder = divmod(task_duration, work_time)
+    count = full_sessions + (1 if remainder else 0)
+    
+    sessions = []
+    for session in range(1, count + 1):
+        breaks_before = session - 1
+        long_before = breaks_before // 4
+        offset = (breaks_before * work_time + (breaks_before - long_before) * short_break
+                  + long_before * long_break)
+        work_duration = work_time if session <= full_sessions else remainder
+        sessions.append((offset, 'pomodoro_work', work_duration, session, None))
+        if session < count:
+            if session % 4 == 0:
+                sessions.append((offset + work_duration, 'pomodoro_long_break', long_break, session,
+                                 f"🍅 Pomodoro Long Break ({long_break} min)"))
+            else:
+                sessions.append((offset + work_duration, 'pomodoro_short_break', short_break, session,
+                                 f"🍅 Pomodoro Break ({short_break} min)"))
+    
+    long_breaks = (count - 1) // 4
+    span = task_duration + (count - 1 - long_breaks) * short_break + long_breaks * long_break
+    work_resets_to = task_duration - 4 * long_breaks * work_time if long_breaks else None
+    return tuple(sessions), span, work_resets_to
+
+def create_pomodoro_sessions(task_duration, work_time, short_break, long_break):
+    """Create Pomodoro breakdown"""
+    sessions, _, _ = pomodoro_template(task_duration, work_time, short_break, long_break)
+    return [
+        {'type': session_type, 'duration': duration, 'session': session}
+        for _, session_type, duration, session, _ in sessions
+    ]
+
+# Fixed meal slots: (meal, name, duration, tolerance, resets the work timer)
+MEAL_SLOTS = [
+    ('breakfast', '🍳 Breakfast', 30, 15, False),
+    ('lunch', '🥗 Lunch Break', 45, 30, True),
+    ('dinner', '🍽️ Dinner Time', 60, 30, True)
+]
+
+def meal_windows(meal_times):
+    """Precompute (window_start, window_end, meal_time, name, duration, resets) per meal"""
+    windows = []
+    for meal, name, duration, tolerance, resets_work in MEAL_SLOTS:
+        meal_time = time_to_minutes(meal_times[meal])
+        windows.append((meal_time - tolerance, meal_time + tolerance, meal_time, name, duration, resets_work))
+    return windows
+
+def analyze_schedule_task(task, analyses=None):
+    """Analyze one task into the entry the placement loop works on"""
+    if analyses is None:
+        analysis = analyze_task_comprehensive(task['name'])
+    else:
+        analysis = analyses[normalize_task_name(task['name'])]
+    priority = calculate_priority(
+        analysis['type'], 
+        analysis['difficulty'], 
+        task['deadline_days'], 
+        analysis['energy_level'], 
+        analysis['mental_load']
+    )
+    
+    return {
+        'name': task['name'],
+        'type': analysis['type'],
+        'difficulty': analysis['difficulty'],
+        'energy_level': analysis['energy_level'],
+        'mental_load': analysis['mental_load'],
+        'intensity': analysis['intensity'],
+        'priority': priority,
+        'duration': analysis['duration'],
+        'deadline_days': task['deadline_days'],
+        'needs_break_after': analysis['needs_break_after'],
+        'break_duration': analysis['break_duration'],
+        'use_pomodoro': analysis['use_pomodoro'],
+        'needs_brain_rest': analysis['needs_brain_rest']
+    }
+
+def priority_order_key(analyzed_task):
+    """Sort key for priority and energy level (used with reverse=True)"""
+    return (analyzed_task['priority'], analyzed_task['energy_level'] == 'high')
+
+def _claim_start(pending_meals, start):
+    """A meal is skipped once anything else starts at its time"""
+    if any(meal[2] == start for meal in pending_meals):
+        pending_meals[:] = [meal for meal in pending_meals if meal[2] != start]
+
+def place_tasks(analyzed_tasks, end_time, settings, schedule, state, task_index=0, checkpoints=None,
+                calendar=None):
+    """Greedy placement loop, resumable from any task boundary
+    
+    state is (current_time, work_time_since_break, pending_meals) before
+    analyzed_tasks[task_index]; new items are appended to schedule with
+    start_time/end_time left unset. If checkpoints is a list, the state
+    before each task is stored at its index as (schedule length, current_time,
+    work_time_since_break, pending meals). Items are moved past any block of
+    calendar they would overlap; the blocks themselves are not added.
+    """
+    current_time, work_time_since_break, pending_meals = state
+    pending_meals = list(pending_meals)
+    
+    if checkpoints is not None:
+        del checkpoints[task_index:]
+        checkpoints.append((len(schedule), current_time, work_time_since_break, tuple(pending_meals)))
+    
+    while task_index < len(analyzed_tasks) and current_time < end_time:
+        
+        # Meal scheduling; a window that closes during an appointment stays open until it ends
+        meal = None
+        for window in pending_meals:
+            window_end = window[1] if calendar is None else calendar.fit(window[1], 0)
+            if window[0] <= current_time <= window_end:
+                meal = window
+                break
+        
+        if meal is not None:
+            _, _, meal_time, meal_name, meal_duration, resets_work = meal
+            if calendar is not None:
+                meal_time = calendar.fit(meal_time, meal_duration)
+            schedule.append({
+                'name': meal_name,
+                'type': 'meal',
+                'start_time': None,
+                'end_time': None,
+                'duration': meal_duration,
+                'time_minutes': meal_time
+            })
+            _claim_start(pending_meals, meal_time)
+            current_time = max(current_time, meal_time + meal_duration)
+            if resets_work:
+                work_time_since_break = 0
+            continue
+        
+        # Long break check
+        if work_time_since_break >= settings['long_break_after'] * 60:
+            if calendar is not None:
+                current_time = calendar.fit(current_time, settings['long_break_duration'])
+            schedule.append({
+                'name': f'☕ Long Break ({settings["long_break_duration"]} min)',
+                'type': 'long_break',
+                'start_time': None,
+                'end_time': None,
+                'duration': settings['long_break_duration'],
+                'time_minutes': current_time
+            })
+            _claim_start(pending_meals, current_time)
+            current_time += settings['long_break_duration']
+            work_time_since_break = 0
+            continue
+        
+        # Task scheduling
+        task = analyzed_tasks[task_index]
+        
+        if calendar is not None:
+            current_time = calendar.fit(current_time, min(task['duration'], settings['pomodoro_work_time'])
+                                        if task['use_pomodoro'] else task['duration'])
+        
+        if current_time + task['duration'] > end_time:
+            break
+        
+        # Pomodoro handling
+        if task['use_pomodoro'] and task['duration'] > settings['pomodoro_work_time']:
+            sessions, span, work_resets_to = pomodoro_template(
+                task['duration'], 
+                settings['pomodoro_work_time'],
+                settings['pomodoro_short_break'],
+                settings['pomodoro_long_break']
+            )
+            task_start = current_time
+            
+            for offset, session_type, duration, session, break_name in sessions:
+                # Without appointments every session sits at its template offset
+                if calendar is None:
+                    current_time = task_start + offset
+                else:
+                    current_time = calendar.fit(current_time, duration)
+                if break_name is None:
+                    schedule.append({
+                        'name': f"🍅 {task['name']} (Session #{session})",
+                        'type': 'pomodoro_work',
+                        'original_type': task['type'],
+                        'priority': task['priority'],
+                        'intensity': task['intensity'],
+                        'start_time': None,
+                        'end_time': None,
+                        'duration': duration,
+                        'deadline_days': task['deadline_days'],
+                        'time_minutes': current_time
+                    })
+                else:
+                    schedule.append({
+                        'name': break_name,
+                        'type': session_type,
+                        'start_time': None,
+                        'end_time': None,
+                        'duration': duration,
+                        'time_minutes': current_time
+                    })
+                _claim_start(pending_meals, current_time)
+                current_time += duration
+            
+            if work_resets_to is None:
+                work_time_since_break += task['duration']
+            else:
+                work_time_since_break = work_resets_to
+        else:
+            # Regular task
+            schedule.append({
+                'name': task['name'],
+                'type': task['type'],
+                'priority': task['priority'],
+                'intensity': task['intensity'],
+                'start_time': None,
+                'end_time': None,
+                'duration': task['duration'],
+                'deadline_days': task['deadline_days'],
+                'time_minutes': current_time
+            })
+            _claim_start(pending_meals, current_time)
+            current_time += task['duration']
+            work_time_since_break += task['duration']
+            
+            # Regular break
+            if task['needs_break_after'] and task_index < len(analyzed_tasks) - 1:
+                if calendar is not None:
+                    current_time = calendar.fit(current_time, task['break_duration'])
+                schedule.append({
+                    'name': f'⏸️ Break ({task["break_duration"]} min)',
+                    'type': 'break',
+                    'start_time': None,
+                    'end_time': None,
+                    'duration': task['break_duration'],
+                    'time_minutes': current_time
+                })
+                _claim_start(pending_meals, current_time)
+                current_time += task['break_duration']
+        
+        # Brain rest
+        if task['needs_brain_rest'] and task['mental_load'] in ['high', 'very_high']:
+            brain_activity = settings['brain_activities'][0] if settings['brain_activities'] else "🧠 Brain Rest"
+            if calendar is not None:
+                current_time = calendar.fit(current_time, settings['brain_rest_duration'])
+            schedule.append({
+                'name': f'🧠 Brain Rest: {brain_activity} ({settings["brain_rest_duration"]} min)',
+                'type': 'brain_rest',
+                'start_time': None,
+                'end_time': None,
+                'duration': settings['brain_rest_duration'],
+                'time_minutes': current_time
+            })
+            _claim_start(pending_meals, current_time)
+            current_time += settings['brain_rest_duration']
+            work_time_since_break = 0
+        
+        task_index += 1
+        if checkpoints is not None:
+            checkpoints.append((len(schedule), current_time, work_time_since_break, tuple(pending_meals)))
+    
+    return schedule
+
+def format_schedule_times(schedule, start=0):
+    """Fill in HH:MM strings; only done at the output boundary"""
+    for item in schedule[start:]:
+        item['start_time'] = minutes_to_time(item['time_minutes'])
+        item['end_time'] = minutes_to_time(item['time_minutes'] + item['duration'])
+
+def create_schedule(tasks, start_hour, end_hour, meal_times, settings, analyses=None, timings=None,
+                    calendar=None):
+    """Enhanced scheduling with analytics tracking
+    
+    Pass a dict as timings to get the seconds spent in each phase, and a
+    Calendar of fixed appointments for tasks to flow around.
+    """
+    if not tasks:
+        return []
+    
+    phases = PhaseTimer(timings)
+    
+    # Analyze all tasks (bulk callers pass analyses keyed on the normalized name)
+    analyzed_tasks = [analyze_schedule_task(task, analyses) for task in tasks]
+    
+    phases.lap('analysis')
+    
+    # Sort by priority and energy level
+    analyzed_tasks.sort(key=priority_order_key, reverse=True)
+    
+    phases.lap('sort')
+    
+    schedule = greedy_schedule(analyzed_tasks, start_hour, end_hour, meal_times, settings, calendar)
+    
+    phases.lap('placement')
+    
+    return schedule
+
+def greedy_schedule(analyzed_tasks, start_hour, end_hour, meal_times, settings, calendar=None):
+    """Place analyzed tasks, already in priority order, as create_schedule does"""
+    # Schedule creation with enhanced logic; all times are integer minutes until the end
+    schedule = place_tasks(analyzed_tasks, end_hour * 60, settings, [],
+                           (start_hour * 60, 0, meal_windows(meal_times)), calendar=calendar)
+    format_schedule_times(schedule)
+    return merge_fixed_items(schedule, calendar, start_hour * 60, end_hour * 60)
+
+class IncrementalScheduler:
+    """Reschedules single-task edits by replaying only the tail of the day
+    
+    Placement is greedy in priority order, so everything before the first
+    task whose sorted position changes is placed exactly as before. The
+    scheduler keeps the state before every task and resumes from there.
+    Any change to hours, meals, settings or appointments needs a new scheduler;
+    the inputs are copied so matches() can tell.
+    """
+    
+    def __init__(self, tasks, start_hour, end_hour, meal_times, settings, timings=None, calendar=None):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.end_time = end_hour * 60
+        self.meal_times = dict(meal_times)
+        self.settings = dict(settings)
+        self.calendar = calendar
+        self.tasks = list(tasks)
+        
+        # Analyzed entries in task order, and the same entries in priority order
+        phases = PhaseTimer(timings)
+        self.entries = [analyze_schedule_task(task) for task in self.tasks]
+        phases.lap('analysis')
+        
+        self.ordered = sorted(self.entries, key=priority_order_key, reverse=True)
+        phases.lap('sort')
+        
+        # Placed items without the calendar's blocks, and the merged schedule
+        self.checkpoints = []
+        self.placed = []
+        self.schedule = []
+        self._replay(0)
+        phases.lap('placement')
+    
+    def matches(self, tasks, start_hour, end_hour, meal_times, settings):
+        """True if the scheduler was built from these tasks, hours, meals and settings"""
+        return (self.tasks == tasks and self.start_hour == start_hour and self.end_hour == end_hour
+                and self.meal_times == meal_times and self.settings == settings)
+    
+    def insert(self, index, task):
+        """Add a task at position index of the task list"""
+        entry = analyze_schedule_task(task)
+        position = self._sorted_position(entry, index)
+        self.tasks.insert(index, task)
+        self.entries.insert(index, entry)
+        self.ordered.insert(position, entry)
+        return self._replay(position)
+    
+    def update(self, index, task):
+        """Replace the task at position index"""
+        old_position = self._remove_entry(index)
+        entry = analyze_schedule_task(task)
+        new_position = self._sorted_position(entry, index)
+        self.tasks[index] = task
+        self.entries.insert(index, entry)
+        self.ordered.insert(new_position, entry)
+        return self._replay(min(old_position, new_position))
+    
+    def delete(self, index):
+        """Remove the task at position index"""
+        position = self._remove_entry(index)
+        del self.tasks[index]
+        return self._replay(position)
+    
+    def _remove_entry(self, index):
+        entry = self.entries.pop(index)
+        position = next(i for i, ordered in enumerate(self.ordered) if ordered is entry)
+        del self.ordered[position]
+        return position
+    
+    def _sorted_position(self, entry, index):
+        """Where a stable sort would put entry if it sat at index in the task list"""
+        key = priority_order_key(entry)
+        earlier = {id(other) for other in self.entries[:index]}
+        position = 0
+        for other in self.ordered:
+            other_key = priority_order_key(other)
+            if other_key > key or (other_key == key and id(other) in earlier):
+                position += 1
+        return position
+    
+    def _replay(self, position):
+        """Recompute placements from the task at position in priority order"""
+        if not self.ordered:
+            self.checkpoints = []
+            self.placed = []
+            self.schedule = []
+            return self.schedule
+        
+        # The last task skips its trailing break, so a change in length moves
+        # the earliest affected slot back to the old and new last tasks too
+        position = min(position, len(self.ordered) - 1, max(len(self.checkpoints) - 2, 0))
+        if position < len(self.checkpoints):
+            length, current_time, work_time_since_break, pending_meals = self.checkpoints[position]
+        else:
+            position = 0
+            length, current_time, work_time_since_break, pending_meals = (
+                0, self.start_hour * 60, 0, meal_windows(self.meal_times))
+        
+        placed = self.placed[:length]
+        place_tasks(self.ordered, self.end_time, self.settings, placed,
+                    (current_time, work_time_since_break, pending_meals), position, self.checkpoints,
+                    self.calendar)
+        format_schedule_times(placed, length)
+        self.placed = placed
+        self.schedule = merge_fixed_items(placed, self.calendar, self.start_hour * 60, self.end_time)
+        return self.schedule
+
+def analyze_tasks_bulk(task_names):
+    """Analyze each distinct task name once, keyed on the normalized name"""
+    analyses = {}
+    for task_name in task_names:
+        key = normalize_task_name(task_name)
+        if key not in analyses:
+            analyses[key] = analyze_task_comprehensive(key)
+    return analyses
+
+# Analyses shared with process pool workers by create_schedules_bulk
+_bulk_analyses = {}
+
+def _init_bulk_worker(analyses):
+    global _bulk_analyses
+    _bulk_analyses = analyses
+
+def _create_schedules_chunk(jobs, analyses=None):
+    if analyses is None:
+        analyses = _bulk_analyses
+    return [create_schedule(*job, analyses=analyses) for job in jobs]
+
+def create_schedules_bulk(jobs, processes=None, chunk_size=64):
+    """Create schedules for many users at once
+    
+    jobs is an iterable of (tasks, start_hour, end_hour, meal_times, settings)
+    tuples, exactly as passed to create_schedule. Task names are analyzed once
+    across all jobs; set processes to spread the jobs over a process pool.
+    Returns the schedules in job order and a stats dict with throughput.
+    """
+    started = time.perf_counter()
+    jobs = list(jobs)
+    analyses = analyze_tasks_bulk(task['name'] for job in jobs for task in job[0])
+    
+    if processes and len(jobs) > chunk_size:
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_bulk_worker,
+                                 initargs=(analyses,)) as executor:
+            schedules = [schedule for chunk in executor.map(_create_schedules_chunk, chunks)
+                         for schedule in chunk]
+    else:
+        schedules = _create_schedules_chunk(jobs, analyses)
+    
+    elapsed = time.perf_counter() - started
+    return schedules, {
+        'schedules': len(schedules),
+        'unique_tasks': len(analyses),
+        'seconds': elapsed,
+        'schedules_per_second': len(schedules) / elapsed if elapsed else 0.0
+    }
+
+# Schedule item types that are not tasks
+NON_TASK_TYPES = ['meal', 'break', 'long_break', 'pomodoro_short_break', 'pomodoro_long_break', 'brain_rest',
+                  'appointment']
+
+def calculate_productivity_score(work_items):
+    """Average priority of the scheduled work, scaled to a 0-100 score"""
+    if not work_items:
+        return 0
+    avg_priority = sum(item.get('priority', 10) for item in work_items) / len(work_items)
+    return min(100, int(avg_priority * 5))
+
+def schedule_totals(schedule):
+    """Daily totals stored in the analytics table"""
+    work_items = [item for item in schedule if item['type'] not in NON_TASK_TYPES]
+    return {
+        'total_tasks': len(work_items),
+        'total_work_time': sum(item['duration'] for item in work_items),
+        'pomodoro_sessions': sum(1 for item in schedule if item['type'] == 'pomodoro_work'),
+        'productivity_score': calculate_productivity_score(work_items)
+    }
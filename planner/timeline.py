@@ -0,0 +1,83 @@
+# planner/timeline.py
+# Schedule timeline rendered as one HTML payload, cached by schedule content
+
+import hashlib
+from html import escape
+
+from .lru import LRUCache
+
+# Items per rendered page; longer schedules are paginated
+TIMELINE_PAGE_SIZE = 50
+
+# Rendered pages kept across sessions
+TIMELINE_CACHE_SIZE = 128
+
+TYPE_EMOJI = {'work': '💼', 'study': '📚', 'health': '💪', 'personal': '🏠', 'social': '👥'}
+
+# Fields the timeline shows; two schedules that agree on these render the same
+_RENDERED_FIELDS = ('name', 'type', 'time_minutes', 'duration', 'intensity', 'priority', 'deadline_days')
+
+def schedule_fingerprint(schedule):
+    """Content hash of everything the timeline shows"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in schedule:
+        digest.update(repr(tuple(item.get(field) for field in _RENDERED_FIELDS)).encode('utf-8'))
+    return digest.hexdigest()
+
+def render_item(number, item):
+    """HTML block of one schedule item"""
+    name = escape(item['name'])
+    times = f"🕐 {item['start_time']} - {item['end_time']}"
+    
+    if item['type'] == 'meal':
+        return (f'<div class="meal-time"><strong>{number}. {name}</strong><br>'
+                f'{times} ({item["duration"]} min)</div>')
+    
+    if item['type'] == 'appointment':
+        return (f'<div class="appointment-time"><strong>{number}. {name}</strong><br>'
+                f'{times} ({item["duration"]} min) | Fixed</div>')
+    
+    if 'break' in item['type']:
+        return f'<div class="break-time"><strong>{number}. {name}</strong><br>{times}</div>'
+    
+    if item['type'] == 'brain_rest':
+        return (f'<div class="brain-rest-time"><strong>{number}. {name}</strong><br>{times}<br>'
+                f'💡 <em>Mental recovery after intensive work</em></div>')
+    
+    if item['type'] == 'pomodoro_work':
+        return (f'<div class="pomodoro-time"><strong>{number}. {name}</strong><br>'
+                f'{times} ({item["duration"]} min)<br>'
+                f'🍅 Pomodoro Session | 🔥 {escape(str(item["intensity"]))} | ⚡ Priority: {item["priority"]}/20</div>')
+    
+    emoji = TYPE_EMOJI.get(item['type'], '📝')
+    deadline_text = f"📅 Due in {item['deadline_days']} days" if item['deadline_days'] is not None else "📅 Flexible"
+    return ('<div style="background-color: #f3e5f5; padding: 10px; border-radius: 5px; '
+            'border-left: 4px solid #9c27b0; margin: 5px 0;">'
+            f'<strong>{number}. {emoji} {name}</strong><br>'
+            f'{times} ({item["duration"]} min)<br>'
+            f'🔥 {escape(str(item.get("intensity", "Moderate")))} | ⚡ Priority: {item["priority"]}/20 | '
+            f'{deadline_text}</div>')
+
+def render_timeline(schedule, page=0, page_size=TIMELINE_PAGE_SIZE):
+    """One HTML string for a page of the schedule, numbered from the start of the schedule"""
+    first = page * page_size
+    return '\n'.join(
+        render_item(number, item)
+        for number, item in enumerate(schedule[first:first + page_size], first + 1)
+    )
+
+def page_count(schedule, page_size=TIMELINE_PAGE_SIZE):
+    return max(1, -(-len(schedule) // page_size))
+
+class TimelineCache(LRUCache):
+    """Thread-safe LRU of rendered timeline pages keyed by schedule fingerprint"""
+    
+    def __init__(self, maxsize=TIMELINE_CACHE_SIZE):
+        super().__init__(maxsize)
+    
+    def get(self, schedule, page=0, page_size=TIMELINE_PAGE_SIZE, fingerprint=None):
+        """Rendered page, built on a miss; pass fingerprint to skip rehashing the schedule"""
+        key = (fingerprint or schedule_fingerprint(schedule), page, page_size)
+        return self.get_or_build(key, render_timeline, schedule, page, page_size)
+
+timeline_cache = TimelineCache()
@@ -0,0 +1,13 @@
+# planner/timeutils.py
+# Clock helpers shared by the scheduling engine and persistence layer
+
+def time_to_minutes(time_str):
+    """Convert HH:MM to minutes from midnight"""
+    hours, minutes = map(int, time_str.split(':'))
+    return hours * 60 + minutes
+
+def minutes_to_time(minutes):
+    """Convert minutes from midnight to HH:MM"""
+    hours = minutes // 60
+    mins = minutes % 60
+    return f"{hours:02d}:{mins:02d}"
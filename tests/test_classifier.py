@@ -0,0 +1,71 @@
+# tests/test_classifier.py
+# TaskClassifier must pick the same pattern as the original per-pattern scoring loop
+
+import random
+
+import pytest
+
+from planner.analysis import (
+    DEFAULT_PATTERN, FALLBACK_PATTERNS, TASK_PATTERNS, analyze_task_comprehensive, build_analysis,
+    normalize_task_name, task_classifier
+)
+
+def reference_properties(task_name):
+    """The scoring loop TaskClassifier replaced: substring hits score their length,
+    the first strictly higher score wins"""
+    task_lower = task_name.lower()
+    best_match = None
+    highest_score = 0
+    
+    for pattern, properties in TASK_PATTERNS.items():
+        score = 0
+        for pattern_word in pattern.split():
+            if pattern_word in task_lower:
+                score += len(pattern_word)
+        
+        if score > highest_score:
+            highest_score = score
+            best_match = properties
+    
+    if best_match is None:
+        for words, properties in FALLBACK_PATTERNS:
+            if any(word in task_lower for word in words):
+                return properties
+        return DEFAULT_PATTERN
+    return best_match
+
+def assert_matches_reference(name):
+    expected = build_analysis(reference_properties(name))
+    assert task_classifier.classify(normalize_task_name(name)) == expected, name
+    assert analyze_task_comprehensive(name) == expected, name
+
+@pytest.mark.parametrize('pattern', list(TASK_PATTERNS))
+def test_every_pattern(pattern):
+    assert_matches_reference(pattern)
+    assert_matches_reference(f"finish {pattern} today")
+
+@pytest.mark.parametrize('word', [word for words, _ in FALLBACK_PATTERNS for word in words])
+def test_fallback_words(word):
+    assert_matches_reference(word)
+    assert_matches_reference(f"quick {word}s before noon")
+
+@pytest.mark.parametrize('name', [
+    '', '   ', 'zzz', 'Gym', 'DEEP WORK session', '  Team   Meeting  ', 'Read\tbook',
+    'homework\nreview', 'WorkOut', 'rerun tests', 'coffee with Friends', 'Study  Group'
+])
+def test_case_and_whitespace(name):
+    assert_matches_reference(name)
+
+def test_random_corpus():
+    rng = random.Random(1234)
+    vocabulary = sorted({word for pattern in TASK_PATTERNS for word in pattern.split()}
+                        | {word for words, _ in FALLBACK_PATTERNS for word in words}
+                        | {'the', 'with', 'plan', 'quick', 'x', 'ing', 'team', 'notes'})
+    for _ in range(2000):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 5))]
+        if rng.random() < 0.3:
+            words = [''.join(words)]
+        name = rng.choice([' ', '  ', '\t']).join(words)
+        if rng.random() < 0.5:
+            name = name.upper() if rng.random() < 0.5 else name.title()
+        assert_matches_reference(name)
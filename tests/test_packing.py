@@ -0,0 +1,42 @@
+# tests/test_packing.py
+# Slot packing on task lists far longer than the recursion limit
+
+import random
+
+from planner import TASK_PATTERNS, create_packed_schedule, create_schedule, schedule_value
+
+SETTINGS = {
+    'long_break_after': 3,
+    'long_break_duration': 30,
+    'pomodoro_work_time': 25,
+    'pomodoro_short_break': 5,
+    'pomodoro_long_break': 20,
+    'brain_rest_duration': 60,
+    'brain_activities': ["🚶 Light walk", "☕ Coffee"]
+}
+
+MEAL_TIMES = {'breakfast': '08:00', 'lunch': '12:30', 'dinner': '18:30'}
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    names = list(TASK_PATTERNS)
+    return [{'name': rng.choice(names), 'deadline_days': rng.choice([None, 0, 1, 2, 3, 5])} for _ in range(count)]
+
+def test_many_tasks_do_not_exhaust_the_stack():
+    stats = {}
+    schedule = create_packed_schedule(make_tasks(1500), 7, 22, MEAL_TIMES, SETTINGS, stats=stats)
+    
+    assert schedule
+    assert stats['nodes'] > 0
+    starts = [item['time_minutes'] for item in schedule]
+    assert starts == sorted(starts)
+
+def test_never_worse_than_greedy():
+    for seed in range(5):
+        tasks = make_tasks(30, seed)
+        stats = {}
+        packed = create_packed_schedule(tasks, 7, 22, MEAL_TIMES, SETTINGS, time_budget=0.02, stats=stats)
+        greedy = create_schedule(tasks, 7, 22, MEAL_TIMES, SETTINGS)
+        
+        assert schedule_value(packed) >= schedule_value(greedy)
+        assert stats['value'] == schedule_value(packed)